@@ -10,7 +10,12 @@ from bpy.props import (
 )
 from bpy.app.handlers import persistent
 from bpy.app.translations import contexts as i18n_contexts
-import re, os
+import re, os, sys
+import functools
+from collections import defaultdict
+
+# Set to True to print verbose isolate/toggle tracing to the console
+_DEBUG = False
 
 class NullWriter:
     def write(self, text):
@@ -19,9 +24,7 @@ class NullWriter:
         pass
 
 # --- Global State Tracking (UI visuals, operator states) ---
-isolate_env_header_state = False
-isolate_env_surface_state = False
-isolate_env_volume_state = False
+_env_isolate_flags = {"HEADER": False, "SURFACE": False, "VOLUME": False}
 current_active_light = None
 current_exclusive_group = None
 group_checkbox_1_state = {}
@@ -33,16 +36,85 @@ other_groups_original_state = {}
 emissive_material_cache = {}
 group_mat_checkbox_state = {}
 environment_checkbox_state = {'environment': True}
-_surface_link_backup = None
-_volume_link_backup = None
+# World output input name -> (from node, from socket) of the link removed by a toggle
+_env_link_backup = {"Surface": None, "Volume": None}
 _light_isolate_state_backup = {}
 emissive_isolate_icon_state = {}
+# (material name, node name) -> ('LINK', from_node, from_socket) or ('VALUE', strength)
 _emissive_link_backup = {}
 
+def _index_node_links(nt):
+    """Map each linked input socket of a node tree to its first incoming link."""
+    idx = {}
+    for link in nt.links:
+        idx.setdefault(link.to_socket, link)
+    return idx
+
+def _surface_from_node(output_node):
+    """Return the node linked into an output node's Surface input, or None."""
+    if output_node is None:
+        return None
+    surface = output_node.inputs.get("Surface")
+    if surface is None or not surface.is_linked:
+        return None
+    return surface.links[0].from_node
+
+# (node tree pointer, node type) -> name of the first node of that type
+_node_of_type_names = {}
+
+def get_node_of_type(nt, node_type):
+    """Return the first node of node_type in nt, remembering its name for O(1) reuse."""
+    key = (nt.as_pointer(), node_type)
+    name = _node_of_type_names.get(key)
+    if name is not None:
+        node = nt.nodes.get(name)
+        if node is not None and node.type == node_type:
+            return node
+    node = next((n for n in nt.nodes if n.type == node_type), None)
+    if node is not None:
+        _node_of_type_names[key] = node.name
+    return node
+
+# Editors that display Light Editor state
+_REDRAW_AREA_TYPES = frozenset({'VIEW_3D', 'NODE_EDITOR', 'PROPERTIES'})
+_V3D_ONLY = frozenset({'VIEW_3D'})
+_NODE_EDITOR_ONLY = frozenset({'NODE_EDITOR'})
+_V3D_AND_NODE_EDITOR = frozenset({'VIEW_3D', 'NODE_EDITOR'})
+_V3D_AND_PROPERTIES = frozenset({'VIEW_3D', 'PROPERTIES'})
+
+def _tag_redraw(context, area_types=_REDRAW_AREA_TYPES, node_tree=None):
+    """Redraw areas of the given types; node editors only if they show node_tree."""
+    for area in context.screen.areas:
+        if area.type not in area_types:
+            continue
+        if node_tree is not None and area.type == 'NODE_EDITOR' and area.spaces.active.node_tree != node_tree:
+            continue
+        area.tag_redraw()
+
+_REGEX_META = frozenset('.^$*+?{}[]\\|()')
+
+@functools.lru_cache(maxsize=8)
+def _filter_matcher(filter_str):
+    """Return a case-insensitive name test for the filter, or None if empty."""
+    if not filter_str:
+        return None
+    if _REGEX_META.isdisjoint(filter_str):
+        needle = filter_str.lower()
+        return lambda name: needle in name.lower()
+    try:
+        return re.compile(filter_str, re.I).search
+    except re.error:
+        needle = filter_str.lower()
+        return lambda name: needle in name.lower()
+
+@functools.lru_cache(maxsize=1)
 def is_blender_4_5_or_higher():
     """Check if the Blender version is 4.5 or higher."""
     return bpy.app.version >= (4, 5, 0)
 
+# Fixed per Blender build, so checked once instead of per drawn row
+_LIGHT_HAS_EXPOSURE = 'exposure' in bpy.types.Light.bl_rna.properties
+
 # --- New Unified Isolate System ---
 
 class UnifiedOnOffManager:
@@ -52,12 +124,19 @@ class UnifiedOnOffManager:
         self._material_backup = {}
         self._env_backup = {}
 
+    def reset(self):
+        """Forget all backups without restoring them."""
+        self._light_backup.clear()
+        self._material_backup.clear()
+        self._env_backup.clear()
+
     def force_all_off(self, context, except_mode=None, except_identifier=None):
         """
         Turn off every light, every emissive socket (Emission nodes & Principled BSDF emission),
         and the world shader, except for the single item identified by (except_mode, except_identifier).
         """
-        print(f"[UnifiedOnOffManager] force_all_off called with mode={except_mode}, identifier={except_identifier}")
+        if _DEBUG:
+            print(f"[UnifiedOnOffManager] force_all_off called with mode={except_mode}, identifier={except_identifier}")
 
         # --- Backup & disable all lights except the isolated one ---
         keep_lights = set()
@@ -71,92 +150,108 @@ class UnifiedOnOffManager:
                     obj.hide_viewport, obj.hide_render, getattr(obj, "light_enabled", True)
                 )
                 if obj.name not in keep_lights:
-                    print(f"[UnifiedOnOffManager]   Disabling light: {obj.name}")
-                    obj.hide_viewport = True
-                    obj.hide_render = True
-                    obj.light_enabled = False
+                    if _DEBUG:
+                        print(f"[UnifiedOnOffManager]   Disabling light: {obj.name}")
+                    # Only write what changes; every write tags the depsgraph
+                    if not obj.hide_viewport:
+                        obj.hide_viewport = True
+                    if not obj.hide_render:
+                        obj.hide_render = True
+                    if obj.light_enabled:
+                        obj.light_enabled = False
                 else:
-                    print(f"[UnifiedOnOffManager]   Keeping light: {obj.name}")
+                    if _DEBUG:
+                        print(f"[UnifiedOnOffManager]   Keeping light: {obj.name}")
 
         # --- Disable all emissive sockets except the isolated one ---
         for mat in bpy.data.materials:
             if not mat.use_nodes:
                 continue
-            for node in mat.node_tree.nodes:
+            for node in get_tree_emissive_nodes(mat.node_tree):
                 # catch both pure Emission nodes and Principled BSDF emission sockets
-                strength_socket = node.inputs.get("Strength") or node.inputs.get("Emission Strength")
+                strength_socket = _emit_strength(node)
                 if not strength_socket:
                     continue
 
                 ident = (mat.name, node.name)
-                print(f"[UnifiedOnOffManager] Processing emissive socket on node: {ident}")
+                if _DEBUG:
+                    print(f"[UnifiedOnOffManager] Processing emissive socket on node: {ident}")
 
                 if not (except_mode == UnifiedIsolateMode.MATERIAL and except_identifier == ident):
                     # backup & disable
                     self._material_backup[ident] = strength_socket.default_value
-                    print(f"[UnifiedOnOffManager]   Disabling emissive socket on: {ident}")
+                    if _DEBUG:
+                        print(f"[UnifiedOnOffManager]   Disabling emissive socket on: {ident}")
                     strength_socket.default_value = 0.0
                 else:
-                    print(f"[UnifiedOnOffManager]   Keeping emissive socket on: {ident}")
+                    if _DEBUG:
+                        print(f"[UnifiedOnOffManager]   Keeping emissive socket on: {ident}")
 
         # --- Disconnect world Surface & Volume ---
         world = context.scene.world
         if world and world.use_nodes:
             nt = world.node_tree
-            output = next((n for n in nt.nodes if n.type == 'OUTPUT_WORLD'), None)
+            output = get_node_of_type(nt, 'OUTPUT_WORLD')
             if output:
+                links = _index_node_links(nt)
                 for name in ("Surface", "Volume"):
-                    sock = output.inputs.get(name)
-                    if sock and sock.is_linked and sock.links:
-                        link = sock.links[0]
+                    link = links.get(output.inputs.get(name))
+                    if link:
                         self._env_backup[name] = (link.from_node.name, link.from_socket.name)
-                        print(f"[UnifiedOnOffManager] Disconnecting world {name} link from {link.from_node.name}.{link.from_socket.name}")
+                        if _DEBUG:
+                            print(f"[UnifiedOnOffManager] Disconnecting world {name} link from {link.from_node.name}.{link.from_socket.name}")
                         nt.links.remove(link)
 
-        # --- Redraw all areas ---
-        for area in context.screen.areas:
-            area.tag_redraw()
+        # --- Redraw the areas showing lights, materials or the panel ---
+        _tag_redraw(context)
 
     def restore_all(self):
         """Restore lights, emissive‐socket values, and world links from backup."""
-        print(f"[UnifiedOnOffManager] restore_all called")
-
-        # Restore lights
-        for obj in bpy.data.objects:
-            if obj.type == 'LIGHT' and obj.name in self._light_backup:
-                vp, rp, en = self._light_backup[obj.name]
-                print(f"[UnifiedOnOffManager] Restoring light {obj.name}: vp={vp}, rp={rp}, enabled={en}")
+        if _DEBUG:
+            print(f"[UnifiedOnOffManager] restore_all called")
+
+        # Restore lights, looked up by name instead of rescanning every object
+        objects = bpy.data.objects
+        for name, (vp, rp, en) in self._light_backup.items():
+            obj = objects.get(name)
+            if obj is not None and obj.type == 'LIGHT':
+                if _DEBUG:
+                    print(f"[UnifiedOnOffManager] Restoring light {obj.name}: vp={vp}, rp={rp}, enabled={en}")
                 obj.hide_viewport = vp
                 obj.hide_render = rp
                 obj.light_enabled = en
 
-        # Restore emissive sockets
+        # Restore emissive sockets; materials are indexed by name in one pass
+        mats = {m.name: m for m in bpy.data.materials} if self._material_backup else {}
         for ident, val in self._material_backup.items():
             mat_name, node_name = ident
-            mat = bpy.data.materials.get(mat_name)
+            mat = mats.get(mat_name)
             if not mat or not mat.use_nodes:
                 continue
             node = mat.node_tree.nodes.get(node_name)
             if not node:
                 continue
-            strength_socket = node.inputs.get("Strength") or node.inputs.get("Emission Strength")
+            strength_socket = _emit_strength(node)
             if strength_socket:
-                print(f"[UnifiedOnOffManager] Restoring emissive socket on {ident} to {val}")
+                if _DEBUG:
+                    print(f"[UnifiedOnOffManager] Restoring emissive socket on {ident} to {val}")
                 strength_socket.default_value = val
 
         # Restore world links
         world = bpy.context.scene.world
         if world and world.use_nodes:
             nt = world.node_tree
-            output = next((n for n in nt.nodes if n.type == 'OUTPUT_WORLD'), None)
+            output = get_node_of_type(nt, 'OUTPUT_WORLD')
             if output:
+                links = _index_node_links(nt)
                 for name, (from_n, from_s) in self._env_backup.items():
                     src = nt.nodes.get(from_n)
                     dst = output.inputs.get(name)
-                    if src and dst and not dst.is_linked:
+                    if src and dst and dst not in links:
                         out_sock = src.outputs.get(from_s)
                         if out_sock:
-                            print(f"[UnifiedOnOffManager] Restoring world {name} link from {from_n}.{from_s}")
+                            if _DEBUG:
+                                print(f"[UnifiedOnOffManager] Restoring world {name} link from {from_n}.{from_s}")
                             nt.links.new(out_sock, dst)
 
         # Clear backups
@@ -182,9 +277,7 @@ class UnifiedIsolateManager:
         self._active_identifier = None
 
     def _redraw_areas(self, context):
-        for area in context.screen.areas:
-            if area.type in {'VIEW_3D', 'NODE_EDITOR', 'PROPERTIES'}:
-                area.tag_redraw()
+        _tag_redraw(context)
 
     def is_active(self, mode=None, identifier=None):
         if mode is None:
@@ -196,29 +289,35 @@ class UnifiedIsolateManager:
     def get_active_info(self):
         return self._active_mode, self._active_identifier
 
+    def reset(self):
+        """Forget the active isolation without restoring its backup."""
+        self._backup.clear()
+        self._active_mode = None
+        self._active_identifier = None
+
     def activate(self, context, mode, identifier=None):
         self._backup.clear()
         self._active_mode = mode
         self._active_identifier = identifier
 
         # Initialize backup for all relevant states
-        for obj in context.view_layer.objects:
-            if obj.type == 'LIGHT':
-                self._backup[obj.name] = (obj.hide_viewport, obj.hide_render)
+        lights = get_view_layer_lights(context.view_layer)
+        for obj in lights:
+            self._backup[obj.name] = (obj.hide_viewport, obj.hide_render)
         for obj, mat, node in find_emissive_objects(context):
             key = (mat.name, node.name)
-            s = node.inputs.get("Strength") if node.type == 'EMISSION' else node.inputs.get("Emission Strength")
+            s = _emit_strength(node)
             if s:
                 self._backup[key] = s.default_value
         world = context.scene.world
         if world and world.use_nodes:
             nt = world.node_tree
-            output = next((n for n in nt.nodes if n.type == 'OUTPUT_WORLD'), None)
+            output = get_node_of_type(nt, 'OUTPUT_WORLD')
             if output:
+                links = _index_node_links(nt)
                 for name in ("Surface", "Volume"):
-                    sock = output.inputs.get(name)
-                    if sock and sock.is_linked and sock.links:
-                        link = sock.links[0]
+                    link = links.get(output.inputs.get(name))
+                    if link:
                         self._backup[f"env_link_{name}"] = (link.from_node.name, link.from_socket.name)
 
         # Turn everything off except the one we're isolating
@@ -227,59 +326,68 @@ class UnifiedIsolateManager:
         # Specific mode handling
         if mode == UnifiedIsolateMode.LIGHT_GROUP or mode == UnifiedIsolateMode.LIGHT_ROW:
             to_keep_enabled, _ = identifier if identifier else (set(), set())
-            for obj in context.view_layer.objects:
-                if obj.type == 'LIGHT' and obj.name in to_keep_enabled:
+            for obj in lights:
+                if obj.name in to_keep_enabled:
                     obj.hide_viewport = self._backup[obj.name][0]
                     obj.hide_render = self._backup[obj.name][1]
         elif mode == UnifiedIsolateMode.MATERIAL:
             _, node_name = identifier if identifier else (None, None)
             for obj, mat, node in find_emissive_objects(context):
                 if (mat.name, node.name) == identifier:
-                    s = node.inputs.get("Strength") if node.type == 'EMISSION' else node.inputs.get("Emission Strength")
+                    s = _emit_strength(node)
                     if s:
                         s.default_value = self._backup[(mat.name, node.name)]
         elif mode == UnifiedIsolateMode.ENVIRONMENT:
             world = context.scene.world
             if world and world.use_nodes:
                 nt = world.node_tree
-                output = next((n for n in nt.nodes if n.type == 'OUTPUT_WORLD'), None)
+                output = get_node_of_type(nt, 'OUTPUT_WORLD')
                 if output:
+                    links = _index_node_links(nt)
                     for name in ("Surface", "Volume"):
                         if f"env_link_{name}" in self._backup:
                             from_node_name, from_socket_name = self._backup[f"env_link_{name}"]
                             from_node = nt.nodes.get(from_node_name)
                             from_socket = from_node.outputs.get(from_socket_name) if from_node else None
                             to_socket = output.inputs.get(name)
-                            if from_socket and to_socket and not to_socket.is_linked:
+                            if from_socket and to_socket and to_socket not in links:
                                 nt.links.new(from_socket, to_socket)
 
         self._redraw_areas(context)
 
     def deactivate(self, context):
-        # Restore everything from backup
+        # Resolve the world output and its links once for all env_link_* entries
+        env_nt = env_output = None
+        env_links = {}
+        world = context.scene.world
+        if world and world.use_nodes:
+            env_nt = world.node_tree
+            env_output = get_node_of_type(env_nt, 'OUTPUT_WORLD')
+            if env_output:
+                env_links = _index_node_links(env_nt)
+
+        # Restore everything from backup; materials are indexed by name in one pass
+        has_mat_keys = any(isinstance(key, tuple) for key in self._backup)
+        mats = {m.name: m for m in bpy.data.materials} if has_mat_keys else {}
         for key, val in self._backup.items():
             if isinstance(key, tuple):  # Emissive nodes
                 mat_name, node_name = key
-                mat = bpy.data.materials.get(mat_name)
+                mat = mats.get(mat_name)
                 if mat and mat.use_nodes:
                     node = mat.node_tree.nodes.get(node_name)
                     if node:
-                        s = node.inputs.get("Strength") if node.type == 'EMISSION' else node.inputs.get("Emission Strength")
+                        s = _emit_strength(node)
                         if s:
                             s.default_value = val
             elif key.startswith("env_link_"):  # Environment links
-                world = context.scene.world
-                if world and world.use_nodes:
-                    nt = world.node_tree
-                    output = next((n for n in nt.nodes if n.type == 'OUTPUT_WORLD'), None)
-                    if output:
-                        socket_name = key.replace("env_link_", "")
-                        from_node_name, from_socket_name = val
-                        from_node = nt.nodes.get(from_node_name)
-                        from_socket = from_node.outputs.get(from_socket_name) if from_node else None
-                        to_socket = output.inputs.get(socket_name)
-                        if from_socket and to_socket and not to_socket.is_linked:
-                            nt.links.new(from_socket, to_socket)
+                if env_output:
+                    socket_name = key.replace("env_link_", "")
+                    from_node_name, from_socket_name = val
+                    from_node = env_nt.nodes.get(from_node_name)
+                    from_socket = from_node.outputs.get(from_socket_name) if from_node else None
+                    to_socket = env_output.inputs.get(socket_name)
+                    if from_socket and to_socket and to_socket not in env_links:
+                        env_links[to_socket] = env_nt.links.new(from_socket, to_socket)
             else:  # Lights
                 obj = bpy.data.objects.get(key)
                 if obj and obj.type == 'LIGHT':
@@ -303,17 +411,6 @@ def update_render_layer(self, context):
     if view_layer and context.window.view_layer != view_layer:
         context.window.view_layer = view_layer
 
-def get_render_layer_items(self, context):
-    """Generate items for the render layer enum property."""
-    items = []
-    for view_layer in context.scene.view_layers:
-        items.append((view_layer.name, view_layer.name, f"Switch to {view_layer.name} render layer"))
-    # Ensure the current view layer is always an option, even if list is somehow empty
-    if not items:
-        current_name = context.view_layer.name if context.view_layer else "Default"
-        items.append((current_name, current_name, "Current render layer"))
-    return items
-
 def update_render_layer(self, context):
     """Update the current render layer."""
     selected = self.selected_render_layer
@@ -322,12 +419,24 @@ def update_render_layer(self, context):
             context.window.view_layer = vl
             break
 
+# Blender requires enum item strings to stay referenced from Python, so the
+# list is kept at module level and only rebuilt when the view layers change.
+_render_layer_items_cache = []
+_render_layer_items_sig = ()
+
 def get_render_layer_items(self, context):
     """Get the list of render layers for the enum property."""
-    items = []
-    for view_layer in context.scene.view_layers:
-        items.append((view_layer.name, view_layer.name, ""))
-    return items
+    global _render_layer_items_cache, _render_layer_items_sig
+    sig = tuple(vl.name for vl in context.scene.view_layers)
+    if sig != _render_layer_items_sig or not _render_layer_items_cache:
+        if sig:
+            _render_layer_items_cache = [(name, name, "") for name in sig]
+        else:
+            # Ensure the current view layer is always an option
+            current_name = context.view_layer.name if context.view_layer else "Default"
+            _render_layer_items_cache = [(current_name, current_name, "Current render layer")]
+        _render_layer_items_sig = sig
+    return _render_layer_items_cache
 
 def gather_layer_collections(parent_lc, result):
     """Recursively gather all layer collections."""
@@ -337,25 +446,71 @@ def gather_layer_collections(parent_lc, result):
 
 def get_layer_collection_by_name(layer_collection, coll_name):
     """Find a layer collection by its name."""
-    if layer_collection.collection.name == coll_name:
-        return layer_collection
-    for child in layer_collection.children:
-        found = get_layer_collection_by_name(child, coll_name)
-        if found:
-            return found
+    stack = [layer_collection]
+    while stack:
+        lc = stack.pop()
+        if lc.collection.name == coll_name:
+            return lc
+        stack.extend(reversed(lc.children))
     return None
 
+# Light object pointer -> light type, cleared when lights or objects change
+_light_kind_cache = {}
+
+def _light_kind(obj):
+    """Return obj.data.type for a light object, cached between depsgraph updates."""
+    key = obj.as_pointer()
+    kind = _light_kind_cache.get(key)
+    if kind is None:
+        kind = _light_kind_cache[key] = obj.data.type
+    return kind
+
+# View layer pointer -> light objects in that view layer; cleared on object,
+# collection and scene updates and on undo/redo, which reallocate datablocks
+_view_layer_lights = {}
+
+def get_view_layer_lights(view_layer):
+    """Return the light objects of a view layer, cached until objects or collections change."""
+    key = view_layer.as_pointer()
+    lights = _view_layer_lights.get(key)
+    if lights is None:
+        _view_layer_lights.clear()
+        lights = _view_layer_lights[key] = [obj for obj in view_layer.objects if obj.type == 'LIGHT']
+    return lights
+
+# (source light list, light type -> lights), cleared with the light kind cache
+_lights_by_kind = [None, {}]
+
+def get_view_layer_lights_by_kind(view_layer):
+    """Return the view layer lights bucketed by light type, built in one pass."""
+    lights = get_view_layer_lights(view_layer)
+    if _lights_by_kind[0] is not lights:
+        buckets = defaultdict(list)
+        for obj in lights:
+            buckets[_light_kind(obj)].append(obj)
+        _lights_by_kind[:] = (lights, dict(buckets))
+    return _lights_by_kind[1]
+
+def set_exclude_recursive(layer_collection, exclude):
+    """Set exclude on a layer collection and all of its descendants."""
+    stack = [layer_collection]
+    while stack:
+        lc = stack.pop()
+        lc.exclude = exclude
+        stack.extend(lc.children)
+
 def update_light_enabled(self, context):
     """Update light visibility based on the light_enabled property."""
-    self.hide_viewport = not self.light_enabled
-    self.hide_render = not self.light_enabled
+    hidden = not self.light_enabled
+    # Each write tags the depsgraph; skip flags that already match
+    if self.hide_viewport != hidden:
+        self.hide_viewport = hidden
+    if self.hide_render != hidden:
+        self.hide_render = hidden
 
 def update_light_turn_off_others(self, context):
     global group_checkbox_2_state, emissive_isolate_icon_state
     scene = context.scene
-    world = scene.world
-    nt = world.node_tree if world and world.use_nodes else None
-    output_node = next((n for n in nt.nodes if n.type == 'OUTPUT_WORLD'), None) if nt else None
 
     if self.light_turn_off_others:
         # --- Activate Isolation ---
@@ -392,9 +547,7 @@ def update_light_turn_off_others(self, context):
             emissive_isolate_icon_state[key] = False  # Reset emissive isolate icons
 
     # --- Redraw UI ---
-    for area in context.screen.areas:
-        if area.type in {'VIEW_3D', 'NODE_EDITOR', 'PROPERTIES'}:
-            area.tag_redraw()
+    _tag_redraw(context)
 
 def get_all_collections(obj):
     """Get all collections an object belongs to, including nested paths."""
@@ -412,16 +565,44 @@ def get_all_collections(obj):
             all_collections.add(" > ".join(path))
     return sorted(all_collections)
 
-def is_emissive_node_active(node):
-    if node.type == 'EMISSION':
-        strength_socket = node.inputs.get("Strength")
-        color_socket = node.inputs.get("Color")
-    elif node.type == 'BSDF_PRINCIPLED':
-        strength_socket = node.inputs.get("Emission Strength")
-        color_socket = node.inputs.get("Emission Color")
-    else:
-        return False
+# Emission input names per shader node type
+_STRENGTH_NAMES = {'EMISSION': "Strength", 'BSDF_PRINCIPLED': "Emission Strength"}
+_COLOR_NAMES = {'EMISSION': "Color", 'BSDF_PRINCIPLED': "Emission Color"}
+_EMISSIVE_NODE_TYPES = frozenset(_STRENGTH_NAMES)
+
+# Node pointer -> (strength, color) emission sockets; cleared with the emissive cache
+_emit_sockets_cache = {}
+
+def _emit_sockets(node):
+    """Return the (strength, color) emission sockets of a node, or (None, None)."""
+    key = node.as_pointer()
+    sockets = _emit_sockets_cache.get(key)
+    if sockets is None:
+        s = _STRENGTH_NAMES.get(node.type)
+        if s is None:
+            sockets = (None, None)
+        else:
+            sockets = (node.inputs.get(s), node.inputs.get(_COLOR_NAMES[node.type]))
+        _emit_sockets_cache[key] = sockets
+    return sockets
 
+def _emit_strength(node):
+    """Return the emission strength socket of an emissive node, or None."""
+    return _emit_sockets(node)[0]
+
+# Node tree pointer -> its EMISSION / BSDF_PRINCIPLED nodes; cleared with the emissive cache
+_tree_emissive_nodes = {}
+
+def get_tree_emissive_nodes(nt):
+    """Return the emission-capable shader nodes of a node tree, indexed in one pass."""
+    key = nt.as_pointer()
+    nodes = _tree_emissive_nodes.get(key)
+    if nodes is None:
+        nodes = _tree_emissive_nodes[key] = [n for n in nt.nodes if n.type in _EMISSIVE_NODE_TYPES]
+    return nodes
+
+def is_emissive_node_active(node):
+    strength_socket, color_socket = _emit_sockets(node)
     if not strength_socket or not color_socket:
         return False
 
@@ -430,9 +611,57 @@ def is_emissive_node_active(node):
         return True
 
     # If not linked, check values
-    strength = strength_socket.default_value
-    color = color_socket.default_value[:3]  # RGB
-    return strength > 0 and any(c > 0 for c in color)
+    if strength_socket.default_value <= 0:
+        return False
+    # Index the RGB channels directly rather than slicing and iterating
+    color = color_socket.default_value
+    return color[0] > 0 or color[1] > 0 or color[2] > 0
+
+# Material pointer -> active emissive nodes reachable from its Surface output
+_material_emissive_nodes = {}
+
+def _collect_emission_nodes(start_nodes):
+    """Return emissive shader nodes upstream of start_nodes, visiting each node once."""
+    found_nodes = []
+    visited = set()
+    # Reversed pushes keep the depth-first, input-order visit of the recursive walk
+    stack = list(reversed(start_nodes))
+    while stack:
+        node = stack.pop()
+        if node in visited:
+            continue
+        visited.add(node)
+        node_type = node.type
+        if node_type == 'EMISSION':
+            found_nodes.append(node)
+        elif node_type == 'BSDF_PRINCIPLED' and node.inputs.get("Emission Strength"):
+            found_nodes.append(node)
+        # Nodes feeding several sockets are pushed once; visited ones not at all
+        upstream = dict.fromkeys(
+            link.from_node for input_socket in node.inputs if input_socket.is_linked
+            for link in input_socket.links
+        )
+        stack.extend(n for n in reversed(upstream) if n not in visited)
+    return found_nodes
+
+def get_material_emissive_nodes(mat):
+    """Return the active emissive nodes of a material, scanning its tree once."""
+    key = mat.as_pointer()
+    nodes = _material_emissive_nodes.get(key)
+    if nodes is not None:
+        return nodes
+    nodes = []
+    if mat.use_nodes and mat.node_tree:
+        nt = mat.node_tree
+        output_node = next((n for n in nt.nodes if n.type == 'OUTPUT_MATERIAL' and n.is_active_output), None)
+        surface = output_node.inputs.get('Surface') if output_node else None
+        if surface and surface.is_linked:
+            found_nodes = _collect_emission_nodes([link.from_node for link in surface.links])
+            nodes = [node for node in found_nodes if is_emissive_node_active(node)]
+            # Stored in display order so rows never re-sort them
+            nodes.sort(key=lambda n: n.name.lower())
+    _material_emissive_nodes[key] = nodes
+    return nodes
 
 def find_emissive_objects(context, search_objects=None):
     """Find all objects with emissive materials, including all reachable emissive nodes."""
@@ -453,43 +682,49 @@ def find_emissive_objects(context, search_objects=None):
             continue
         for slot in obj.material_slots:
             mat = slot.material
-            if not mat or not mat.use_nodes or mat.name in seen:
+            if not mat:
                 continue
-            seen.add(mat.name)
-            nt = mat.node_tree
-            output_node = next((n for n in nt.nodes if n.type == 'OUTPUT_MATERIAL' and n.is_active_output), None)
-            if not output_node or not output_node.inputs.get('Surface') or not output_node.inputs['Surface'].is_linked:
+            ptr = mat.as_pointer()
+            if ptr in seen:
                 continue
-
-            def find_emission_nodes(node, visited, found_nodes):
-                if node in visited:
-                    return
-                visited.add(node)
-                if node.type == 'EMISSION':
-                    found_nodes.append(node)
-                elif node.type == 'BSDF_PRINCIPLED' and node.inputs.get("Emission Strength"):
-                    found_nodes.append(node)
-                for input_socket in node.inputs:
-                    if input_socket.is_linked:
-                        for link in input_socket.links:
-                            find_emission_nodes(link.from_node, visited, found_nodes)
-
-            found_nodes = []
-            for link in output_node.inputs['Surface'].links:
-                find_emission_nodes(link.from_node, set(), found_nodes)
-            for node in found_nodes:
-                if is_emissive_node_active(node):
-                    emissive_objs.append((obj, mat, node))
+            seen.add(ptr)
+            for node in get_material_emissive_nodes(mat):
+                emissive_objs.append((obj, mat, node))
 
     if use_cache:
-        if not emissive_objs:
-            if cache_key in emissive_material_cache:
-                del emissive_material_cache[cache_key]
-        else:
-            emissive_material_cache[cache_key] = emissive_objs
+        # Empty results are cached too; the depsgraph handler clears the cache
+        emissive_material_cache[cache_key] = emissive_objs
 
     return emissive_objs
 
+# (source pairs, their materials) from the last lookup
+_emissive_mat_set = [None, frozenset()]
+
+def get_emissive_materials(emissive_pairs):
+    """Return the materials of emissive_pairs as a set, reusing the last result."""
+    # find_emissive_objects hands back the same list until the cache is invalidated
+    if _emissive_mat_set[0] is not emissive_pairs:
+        # Structs hash by pointer
+        _emissive_mat_set[:] = (emissive_pairs, frozenset(mat for _, mat, _ in emissive_pairs))
+    return _emissive_mat_set[1]
+
+# (source pairs, filter text, filtered pairs) from the last panel draw
+_filtered_emissive = [None, None, None]
+
+def filter_emissive_pairs(emissive_pairs, filter_text):
+    """Filter emissive pairs by object or material name, reusing the last result."""
+    cached_pairs, cached_filter, filtered = _filtered_emissive
+    # find_emissive_objects hands back the same list until the cache is invalidated
+    if cached_pairs is emissive_pairs and cached_filter == filter_text:
+        return filtered
+    match = _filter_matcher(filter_text)
+    if match is None:
+        filtered = emissive_pairs
+    else:
+        filtered = [(o, m, n) for o, m, n in emissive_pairs if match(o.name) or match(m.name)]
+    _filtered_emissive[:] = (emissive_pairs, filter_text, filtered)
+    return filtered
+
 def draw_environment_row(box, context):
     """Draw the environment row in the UI."""
     world = context.scene.world
@@ -497,7 +732,7 @@ def draw_environment_row(box, context):
         return
     row = box.row(align=True)
     nt = world.node_tree
-    background_node = next((n for n in nt.nodes if n.type == 'BACKGROUND'), None)
+    background_node = get_node_of_type(nt, 'BACKGROUND')
     if not background_node:
         return
     color_input = background_node.inputs.get("Color")
@@ -545,7 +780,7 @@ def draw_environment_row(box, context):
     else:
         col_strength.label(text="")
 
-def draw_emissive_row(box, obj, mat, emissive_nodes):
+def draw_emissive_row(box, obj, mat, emissive_nodes, selected_names=None):
     """
     Draw a row for a material, with a collapsible sub-list for emissive nodes.
     - If multiple_nodes OR single-node with linked socket, split into four equal columns.
@@ -559,9 +794,8 @@ def draw_emissive_row(box, obj, mat, emissive_nodes):
 
     # --- Toggle & Isolate (header) ---
     enabled = any(
-        (n.inputs.get("Strength") or n.inputs.get("Emission Strength")).default_value > 0 or
-        (n.inputs.get("Strength") or n.inputs.get("Emission Strength")).is_linked
-        for n in emissive_nodes
+        s.default_value > 0 or s.is_linked
+        for s in map(_emit_strength, emissive_nodes) if s
     )
     icon = 'OUTLINER_OB_LIGHT' if enabled else 'LIGHT_DATA'
     op_toggle = row.operator("le.toggle_emission", text="", icon=icon, depress=enabled)
@@ -575,8 +809,9 @@ def draw_emissive_row(box, obj, mat, emissive_nodes):
     op_iso.node_name = ""
 
     # --- Select & Expand ---
+    is_selected = obj.name in selected_names if selected_names is not None else obj.select_get()
     row.operator("le.select_light", text="",
-                 icon="RESTRICT_SELECT_ON" if obj.select_get() else "RESTRICT_SELECT_OFF"
+                 icon="RESTRICT_SELECT_ON" if is_selected else "RESTRICT_SELECT_OFF"
     ).name = obj.name
 
     if multiple_nodes:
@@ -586,8 +821,7 @@ def draw_emissive_row(box, obj, mat, emissive_nodes):
         row.label(text="", icon='BLANK1')
 
     # Determine if single-node linked case
-    color_input    = first_node.inputs.get("Color") if first_node.type == 'EMISSION' else first_node.inputs.get("Emission Color")
-    strength_input = first_node.inputs.get("Strength") if first_node.type == 'EMISSION' else first_node.inputs.get("Emission Strength")
+    strength_input, color_input = _emit_sockets(first_node)
     linked_case = (not multiple_nodes) and ((color_input and color_input.is_linked) or (strength_input and strength_input.is_linked))
 
     # --- Header columns: equal for multi-node or linked single-node ---
@@ -643,11 +877,11 @@ def draw_emissive_row(box, obj, mat, emissive_nodes):
     # --- Sub-rows for each emissive node ---
     if multiple_nodes and not collapsed:
         sub_box = box.box()
-        for subnode in sorted(emissive_nodes, key=lambda x: x.name.lower()):
+        for subnode in emissive_nodes:
             sub_row = sub_box.row(align=True)
             sub_row.label(text="", icon='BLANK1')
 
-            s_in = subnode.inputs.get("Strength") if subnode.type == 'EMISSION' else subnode.inputs.get("Emission Strength")
+            s_in, color_in = _emit_sockets(subnode)
             val = s_in.default_value if s_in else 0.0
             ico = 'OUTLINER_OB_LIGHT' if (s_in and (s_in.is_linked or val > 0)) else 'LIGHT_DATA'
             op_n = sub_row.operator("le.toggle_emission", text="", icon=ico, depress=(val > 0))
@@ -668,7 +902,6 @@ def draw_emissive_row(box, obj, mat, emissive_nodes):
             # Color socket
             c_col = sub_row.column(align=True)
             c_col.ui_units_x = 4
-            color_in = subnode.inputs.get("Color") if subnode.type == 'EMISSION' else subnode.inputs.get("Emission Color")
             if color_in:
                 if color_in.is_linked:
                     rc = c_col.row(align=True)
@@ -717,20 +950,116 @@ def use_metal(context):
     cscene = context.scene.cycles
     return (get_device_type(context) == 'METAL' and cscene.device == 'GPU' and backend_has_active_gpu(context))
 
+@functools.lru_cache(maxsize=1)
+def _macos_major_version():
+    """Major macOS version, read once per session."""
+    import platform
+    version, _, _ = platform.mac_ver()
+    return int(version.split(".")[0])
+
 def use_mnee(context):
     """Check if MNEE is available (Metal-specific check)."""
-    if use_metal(context):
-        import platform
-        version, _, _ = platform.mac_ver()
-        major_version = version.split(".")[0]
-        if int(major_version) < 13:
-            return False
+    if use_metal(context) and _macos_major_version() < 13:
+        return False
     return True
 
+def _draw_extra_params_cycles(col, light, engine):
+    """Draw the Cycles light parameters."""
+    clamp = light.cycles
+    if light.type in {'POINT', 'SPOT'}:
+        col.prop(light, "use_soft_falloff")
+        col.prop(light, "shadow_soft_size", text="Radius")
+    elif light.type == 'SUN':
+        col.prop(light, "angle")
+    elif light.type == 'AREA':
+        col.prop(light, "shape", text="Shape")
+        sub = col.column(align=True)
+        if light.shape in {'SQUARE', 'DISK'}:
+            sub.prop(light, "size")
+        elif light.shape in {'RECTANGLE', 'ELLIPSE'}:
+            sub.prop(light, "size", text="Size X")
+            sub.prop(light, "size_y", text="Y")
+    if not (light.type == 'AREA' and clamp.is_portal):
+        col.separator()
+        sub = col.column()
+        sub.prop(clamp, "max_bounces")
+    sub = col.column(align=True)
+    sub.active = not (light.type == 'AREA' and clamp.is_portal)
+    sub.prop(light, "use_shadow", text="Cast Shadow")
+    sub.prop(clamp, "use_multiple_importance_sampling", text="Multiple Importance")
+    if use_mnee(bpy.context):
+        sub.prop(clamp, "is_caustics_light", text="Shadow Caustics")
+    if light.type == 'AREA':
+        col.prop(clamp, "is_portal", text="Portal")
+    if light.type == 'SPOT':
+        col.separator()
+        row = col.row(align=True)
+        row.alignment = 'CENTER'
+        row.label(text="Spot Shape")
+        col.prop(light, "spot_size", text="Spot Size")
+        col.prop(light, "spot_blend", text="Blend", slider=True)
+        col.prop(light, "show_cone")
+    elif light.type == 'AREA':
+        col.separator()
+        row = col.row(align=True)
+        row.alignment = 'CENTER'
+        row.label(text="Beam Shape")
+        col.prop(light, "spread", text="Spread")
+
+def _draw_extra_params_eevee(col, light, engine):
+    """Draw the EEVEE light parameters."""
+    col.separator()
+    if light.type in {'POINT', 'SPOT'}:
+        col.prop(light, "use_soft_falloff")
+        col.prop(light, "shadow_soft_size", text="Radius")
+    elif light.type == 'SUN':
+        col.prop(light, "angle")
+    elif light.type == 'AREA':
+        col.prop(light, "shape")
+        sub = col.column(align=True)
+        if light.shape in {'SQUARE', 'DISK'}:
+            sub.prop(light, "size")
+        elif light.shape in {'RECTANGLE', 'ELLIPSE'}:
+            sub.prop(light, "size", text="Size X")
+            sub.prop(light, "size_y", text="Y")
+    if engine == 'BLENDER_EEVEE_NEXT':
+        col.separator()
+        col.prop(light, "use_shadow", text="Cast Shadow")
+        col.prop(light, "use_shadow_jitter")
+        col.prop(light, "shadow_jitter_overblur", text="Overblur")
+        col.prop(light, "shadow_filter_radius", text="Radius")
+        col.prop(light, "shadow_maximum_resolution", text="Resolution Limit")
+    if light and light.type == 'SPOT':
+        col.separator()
+        row = col.row(align=True)
+        row.alignment = 'CENTER'
+        row.label(text="Spot Shape")
+        col.prop(light, "spot_size", text="Size")
+        col.prop(light, "spot_blend", text="Blend", slider=True)
+        col.prop(light, "show_cone")
+    col.separator()
+    col.prop(light, "diffuse_factor", text="Diffuse")
+    col.prop(light, "specular_factor", text="Specular")
+    col.prop(light, "volume_factor", text="Volume", text_ctxt=i18n_contexts.id_id)
+    if light.type != 'SUN':
+        col.separator()
+        sub = col.column()
+        sub.prop(light, "use_custom_distance", text="Custom Distance")
+        sub.active = light.use_custom_distance
+        sub.prop(light, "cutoff_distance", text="Distance")
+
+# Render engine -> drawer for its light parameters
+_EXTRA_PARAM_DRAWERS = {
+    'CYCLES': _draw_extra_params_cycles,
+    'BLENDER_EEVEE': _draw_extra_params_eevee,
+    'BLENDER_EEVEE_NEXT': _draw_extra_params_eevee,
+}
+
 def draw_extra_params(self, box, obj, light):
     """Draw extra light parameters based on the light type and render engine."""
     if light and isinstance(light, bpy.types.Light) and not light.use_nodes:
         layout = box
+        engine = bpy.context.engine
         row = layout.row()
         row.prop(light, "type", expand=True)
         col = layout.column()
@@ -741,87 +1070,9 @@ def draw_extra_params(self, box, obj, light):
                 col.prop(light, "temperature", text="Temperature")
             col.prop(light, "normalize", text="Normalize")
             col.separator()
-        if bpy.context.engine == 'CYCLES':
-            clamp = light.cycles
-            if light.type in {'POINT', 'SPOT'}:
-                col.prop(light, "use_soft_falloff")
-                col.prop(light, "shadow_soft_size", text="Radius")
-            elif light.type == 'SUN':
-                col.prop(light, "angle")
-            elif light.type == 'AREA':
-                col.prop(light, "shape", text="Shape")
-                sub = col.column(align=True)
-                if light.shape in {'SQUARE', 'DISK'}:
-                    sub.prop(light, "size")
-                elif light.shape in {'RECTANGLE', 'ELLIPSE'}:
-                    sub.prop(light, "size", text="Size X")
-                    sub.prop(light, "size_y", text="Y")
-            if not (light.type == 'AREA' and clamp.is_portal):
-                col.separator()
-                sub = col.column()
-                sub.prop(clamp, "max_bounces")
-            sub = col.column(align=True)
-            sub.active = not (light.type == 'AREA' and clamp.is_portal)
-            sub.prop(light, "use_shadow", text="Cast Shadow")
-            sub.prop(clamp, "use_multiple_importance_sampling", text="Multiple Importance")
-            if use_mnee(bpy.context):
-                sub.prop(clamp, "is_caustics_light", text="Shadow Caustics")
-            if light.type == 'AREA':
-                col.prop(clamp, "is_portal", text="Portal")
-            if light.type == 'SPOT':
-                col.separator()
-                row = col.row(align=True)
-                row.alignment = 'CENTER'
-                row.label(text="Spot Shape")
-                col.prop(light, "spot_size", text="Spot Size")
-                col.prop(light, "spot_blend", text="Blend", slider=True)
-                col.prop(light, "show_cone")
-            elif light.type == 'AREA':
-                col.separator()
-                row = col.row(align=True)
-                row.alignment = 'CENTER'
-                row.label(text="Beam Shape")
-                col.prop(light, "spread", text="Spread")
-        if ((bpy.context.engine == 'BLENDER_EEVEE') or (bpy.context.engine == 'BLENDER_EEVEE_NEXT')):
-            col.separator()
-            if light.type in {'POINT', 'SPOT'}:
-                col.prop(light, "use_soft_falloff")
-                col.prop(light, "shadow_soft_size", text="Radius")
-            elif light.type == 'SUN':
-                col.prop(light, "angle")
-            elif light.type == 'AREA':
-                col.prop(light, "shape")
-                sub = col.column(align=True)
-                if light.shape in {'SQUARE', 'DISK'}:
-                    sub.prop(light, "size")
-                elif light.shape in {'RECTANGLE', 'ELLIPSE'}:
-                    sub.prop(light, "size", text="Size X")
-                    sub.prop(light, "size_y", text="Y")
-            if bpy.context.engine == 'BLENDER_EEVEE_NEXT':
-                col.separator()
-                col.prop(light, "use_shadow", text="Cast Shadow")
-                col.prop(light, "use_shadow_jitter")
-                col.prop(light, "shadow_jitter_overblur", text="Overblur")
-                col.prop(light, "shadow_filter_radius", text="Radius")
-                col.prop(light, "shadow_maximum_resolution", text="Resolution Limit")
-            if light and light.type == 'SPOT':
-                col.separator()
-                row = col.row(align=True)
-                row.alignment = 'CENTER'
-                row.label(text="Spot Shape")
-                col.prop(light, "spot_size", text="Size")
-                col.prop(light, "spot_blend", text="Blend", slider=True)
-                col.prop(light, "show_cone")
-            col.separator()
-            col.prop(light, "diffuse_factor", text="Diffuse")
-            col.prop(light, "specular_factor", text="Specular")
-            col.prop(light, "volume_factor", text="Volume", text_ctxt=i18n_contexts.id_id)
-            if light.type != 'SUN':
-                col.separator()
-                sub = col.column()
-                sub.prop(light, "use_custom_distance", text="Custom Distance")
-                sub.active = light.use_custom_distance
-                sub.prop(light, "cutoff_distance", text="Distance")
+        drawer = _EXTRA_PARAM_DRAWERS.get(engine)
+        if drawer is not None:
+            drawer(col, light, engine)
 
 # --- Operators (refactored to use UnifiedIsolateManager) ---
 
@@ -832,14 +1083,16 @@ class LE_OT_ToggleEnvironment(bpy.types.Operator):
     bl_idname = "le.toggle_environment"
     bl_label = "Toggle Environment Lighting"
 
+    @classmethod
+    def poll(cls, context):
+        world = context.scene.world
+        return world is not None and world.use_nodes
+
     def execute(self, context):
-        global environment_checkbox_state, _surface_link_backup, _volume_link_backup
+        global environment_checkbox_state
         world = context.scene.world
-        if not world or not world.use_nodes:
-            self.report({'WARNING'}, "No world or world shader found")
-            return {'CANCELLED'}
         nt = world.node_tree
-        background_node = next((n for n in nt.nodes if n.type == 'BACKGROUND'), None)
+        background_node = get_node_of_type(nt, 'BACKGROUND')
         if not background_node:
             self.report({'WARNING'}, "No Background node found in world shader")
             return {'CANCELLED'}
@@ -847,7 +1100,7 @@ class LE_OT_ToggleEnvironment(bpy.types.Operator):
         if not strength_input:
             self.report({'WARNING'}, "Background node has no Strength input")
             return {'CANCELLED'}
-        output_node = next((n for n in nt.nodes if n.type == 'OUTPUT_WORLD'), None)
+        output_node = get_node_of_type(nt, 'OUTPUT_WORLD')
         if not output_node:
             self.report({'WARNING'}, "No World Output node found")
             return {'CANCELLED'}
@@ -856,105 +1109,77 @@ class LE_OT_ToggleEnvironment(bpy.types.Operator):
             # Store current state and disable
             world['original_environment_strength'] = strength_input.default_value
             strength_input.default_value = 0.0
-            # Disconnect Surface and Volume inputs
+            # Disconnect Surface and Volume inputs: back up both first, then remove in one pass
+            links = _index_node_links(nt)
+            to_remove = []
             for socket_name in ("Surface", "Volume"):
-                socket = output_node.inputs.get(socket_name)
-                if socket and socket.is_linked and socket.links:
-                    try:
-                        link = socket.links[0]
-                        if link.is_valid:
-                            if socket_name == "Surface":
-                                _surface_link_backup = (link.from_node.name, link.from_socket.name)
-                            else:
-                                _volume_link_backup = (link.from_node.name, link.from_socket.name)
-                            nt.links.remove(link)
-                    except Exception as e:
-                        self.report({'WARNING'}, f"Failed to remove link for {socket_name}: {e}")
+                link = links.get(output_node.inputs.get(socket_name))
+                if link and link.is_valid:
+                    _env_link_backup[socket_name] = (link.from_node.name, link.from_socket.name)
+                    to_remove.append((socket_name, link))
+            for socket_name, link in to_remove:
+                try:
+                    nt.links.remove(link)
+                except Exception as e:
+                    self.report({'WARNING'}, f"Failed to remove link for {socket_name}: {e}")
         else:
             # Restore state
             restored_strength = world.get('original_environment_strength', 1.0)
             strength_input.default_value = restored_strength
             # Reconnect Surface and Volume inputs
-            for socket_name, backup in [("Surface", _surface_link_backup), ("Volume", _volume_link_backup)]:
+            links = _index_node_links(nt)
+            for socket_name, backup in _env_link_backup.items():
                 if backup:
                     node_name, socket_name_from = backup
                     from_node = nt.nodes.get(node_name)
                     from_socket = from_node.outputs.get(socket_name_from) if from_node else None
                     to_socket = output_node.inputs.get(socket_name)
-                    if from_socket and to_socket and not to_socket.is_linked:
+                    if from_socket and to_socket and to_socket not in links:
                         try:
                             nt.links.new(from_socket, to_socket)
                         except Exception as e:
                             self.report({'WARNING'}, f"Failed to restore link for {socket_name}: {e}")
                     # Clear backup after restoration (optional, keeps it clean)
-                    if socket_name == "Surface":
-                        _surface_link_backup = None
-                    else:
-                        _volume_link_backup = None
+                    _env_link_backup[socket_name] = None
         environment_checkbox_state['environment'] = not is_on
-        # Redraw relevant areas
-        for area in context.screen.areas:
-            if area.type in ('VIEW_3D', 'NODE_EDITOR'):
-                area.tag_redraw()
+        # Redraw the panel and any node editor showing the world
+        _tag_redraw(context, _V3D_AND_NODE_EDITOR, node_tree=nt)
         return {'FINISHED'}
 
-def execute(self, context):
-    global isolate_env_header_state, isolate_env_surface_state, isolate_env_volume_state
-    global env_isolated_ui_state  # ← ADD THIS
-
-    flag_map = {
-        "HEADER": "isolate_env_header_state",
-        "SURFACE": "isolate_env_surface_state",
-        "VOLUME": "isolate_env_volume_state",
-    }
-    mode_map = {
-        "HEADER": UnifiedIsolateMode.ENVIRONMENT,
-        "SURFACE": UnifiedIsolateMode.ENVIRONMENT_SURFACE,
-        "VOLUME": UnifiedIsolateMode.ENVIRONMENT_VOLUME,
-    }
-
-    unified_mode = mode_map.get(self.mode, UnifiedIsolateMode.ENVIRONMENT)
-    is_currently_active = _unified_isolate_manager.is_active(unified_mode)
-
-    if not is_currently_active:
-        globals()[flag_map[self.mode]] = True
-        if self.mode == "HEADER":
-            env_isolated_ui_state = True  # ← SET TRUE when activated
-        _unified_isolate_manager.activate(context, unified_mode)
-    else:
-        globals()[flag_map[self.mode]] = False
-        if self.mode == "HEADER":
-            env_isolated_ui_state = False  # ← SET FALSE when deactivated
-        _unified_isolate_manager.deactivate(context)
-
-    return {'FINISHED'}
-
 class LE_OT_SelectEnvironment(bpy.types.Operator):
     """Select the environment world in the Shader Editor."""
     bl_idname = "le.select_environment"
     bl_label = "Select Environment"
 
+    @classmethod
+    def poll(cls, context):
+        return context.scene.world is not None
+
     def execute(self, context):
         world = context.scene.world
-        if not world:
-            self.report({'WARNING'}, "No world found")
-            return {'CANCELLED'}
-        for area in context.screen.areas:
-            if area.type == 'VIEW_3D':
-                for space in area.spaces:
-                    if space.type == 'VIEW_3D':
-                        space.shading.type = 'MATERIAL'
-                        break
-                break
+        view3d_area = node_area = None
         for area in context.screen.areas:
-            if area.type == 'NODE_EDITOR':
-                area.spaces.active.node_tree = world.node_tree
-                break
+            if area.type == 'VIEW_3D' and view3d_area is None:
+                view3d_area = area
+            elif area.type == 'NODE_EDITOR' and node_area is None:
+                node_area = area
+        if view3d_area:
+            view3d_area.spaces.active.shading.type = 'MATERIAL'
+        if node_area:
+            node_area.spaces.active.node_tree = world.node_tree
         else:
             self.report({'INFO'}, "No Shader Editor found; open one to edit world shader")
         self.report({'INFO'}, f"Selected world: {world.name}")
         return {'FINISHED'}
 
+# Emissive group keys -> required selection state (None selects regardless)
+_EMISSIVE_GROUP_SELECTION = {
+    "kind_EMISSIVE": None,
+    "all_emissives_alpha": None,
+    "selected_emissives": True,
+    "not_selected_emissives": False,
+}
+
 class LE_OT_SelectGroup(bpy.types.Operator):
     """Select all objects in the specified group."""
     bl_idname = "le.select_group"
@@ -962,112 +1187,128 @@ class LE_OT_SelectGroup(bpy.types.Operator):
     group_key: bpy.props.StringProperty()
 
     def execute(self, context):
-        objects_to_select = []
-        objects_in_group = []
-        deselect_all_flag = False
-        filter_str = context.scene.light_editor_filter.lower()
-
-        # Handle different group types
-        if self.group_key.startswith("coll_"):
-            coll_name = self.group_key[5:]
-            if coll_name == "No Collection":
-                for obj in context.view_layer.objects:
-                    if obj.type == 'LIGHT' or (obj.type == 'MESH' and any(mat in [m for o, m, n in find_emissive_objects(context)] for mat in obj.material_slots)):
-                        objects_in_group.append(obj)
-                        if len(obj.users_collection) == 1 and obj.users_collection[0].name == "Scene Collection":
-                            if (not filter_str or re.search(filter_str, obj.name, re.I)) and (obj.type != 'LIGHT' or obj.light_enabled):
-                                objects_to_select.append(obj)
-            else:
-                collection = bpy.data.collections.get(coll_name)
-                if collection:
-                    for obj in collection.all_objects:
-                        if obj.type == 'LIGHT' or (obj.type == 'MESH' and any(mat in [m for o, m, n in find_emissive_objects(context)] for mat in obj.material_slots)):
-                            objects_in_group.append(obj)
-                            if (not filter_str or re.search(filter_str, obj.name, re.I)) and (obj.type != 'LIGHT' or obj.light_enabled):
-                                objects_to_select.append(obj)
-        elif self.group_key.startswith("kind_"):
-            kind = self.group_key[5:]
-            if kind == "EMISSIVE":
-                for obj, mat, node in find_emissive_objects(context):
-                    if not filter_str or re.search(filter_str, obj.name, re.I) or re.search(filter_str, mat.name, re.I):
-                        objects_in_group.append(obj)
-                        objects_to_select.append(obj)
-            else:
-                for obj in context.view_layer.objects:
-                    if obj.type == 'LIGHT' and obj.data.type == kind:
-                        if obj.light_enabled:
-                            objects_in_group.append(obj)
-                        if (not filter_str or re.search(filter_str, obj.name, re.I)) and obj.light_enabled:
-                            objects_to_select.append(obj)
-        elif self.group_key == "all_lights_alpha":
-            for obj in context.view_layer.objects:
-                if obj.type == 'LIGHT' and obj.light_enabled:
-                    objects_in_group.append(obj)
-                    if not filter_str or re.search(filter_str, obj.name, re.I):
-                        objects_to_select.append(obj)
-        elif self.group_key == "all_emissives_alpha":
-            for obj, mat, node in find_emissive_objects(context):
-                if not filter_str or re.search(filter_str, obj.name, re.I) or re.search(filter_str, mat.name, re.I):
-                    objects_in_group.append(obj)
-                    objects_to_select.append(obj)
-        elif self.group_key == "selected_lights":
-            for obj in context.view_layer.objects:
-                if obj.type == 'LIGHT' and obj.select_get() and obj.light_enabled:
-                    objects_in_group.append(obj)
-                    if not filter_str or re.search(filter_str, obj.name, re.I):
-                        objects_to_select.append(obj)
-        elif self.group_key == "selected_emissives":
-            for obj, mat, node in find_emissive_objects(context):
-                if obj.select_get():
-                    if not filter_str or re.search(filter_str, obj.name, re.I) or re.search(filter_str, mat.name, re.I):
-                        objects_in_group.append(obj)
-                        objects_to_select.append(obj)
-        elif self.group_key == "not_selected_lights":
-            for obj in context.view_layer.objects:
-                if obj.type == 'LIGHT' and not obj.select_get() and obj.light_enabled:
-                    objects_in_group.append(obj)
-                    if not filter_str or re.search(filter_str, obj.name, re.I):
-                        objects_to_select.append(obj)
-        elif self.group_key == "not_selected_emissives":
-            for obj, mat, node in find_emissive_objects(context):
-                if not obj.select_get():
-                    if not filter_str or re.search(filter_str, obj.name, re.I) or re.search(filter_str, mat.name, re.I):
-                        objects_in_group.append(obj)
-                        objects_to_select.append(obj)
-        elif self.group_key == "env_header":
+        group_key = self.group_key
+        if group_key == "env_header":
             self.report({'INFO'}, "Selected world: {}".format(context.scene.world.name))
             for area in context.screen.areas:
                 if area.type == 'NODE_EDITOR':
                     area.spaces.active.node_tree = context.scene.world.node_tree
             return {'FINISHED'}
 
+        objects_to_select = []
+        objects_in_group = []
+        deselect_all_flag = False
+        search = _filter_matcher(context.scene.light_editor_filter)
+
+        def name_ok(*names):
+            return search is None or any(search(n) for n in names)
+
+        emissive_pairs = find_emissive_objects(context)
+        emissive_mats = get_emissive_materials(emissive_pairs)
+
+        def is_emissive_mesh(obj):
+            return obj.type == 'MESH' and any(
+                ms.material in emissive_mats for ms in obj.material_slots
+            )
+
+        # Classify the view layer objects in a single pass; only collection
+        # groups list emissive meshes, so other keys skip their material scan
+        include_emissive = group_key.startswith("coll_")
+        enabled_lights = []
+        selected_lights = []
+        not_selected_lights = []
+        unparented_candidates = []
+        for obj in context.view_layer.objects:
+            if obj.type == 'LIGHT':
+                if obj.light_enabled:
+                    enabled_lights.append(obj)
+                    if obj.select_get():
+                        selected_lights.append(obj)
+                    else:
+                        not_selected_lights.append(obj)
+            elif not include_emissive or not is_emissive_mesh(obj):
+                continue
+            if len(obj.users_collection) == 1 and obj.users_collection[0].name == "Scene Collection":
+                unparented_candidates.append(obj)
+
+        light_groups = {
+            "all_lights_alpha": enabled_lights,
+            "selected_lights": selected_lights,
+            "not_selected_lights": not_selected_lights,
+        }
+
+        # Handle different group types: literal keys first, then "<prefix>_<arg>" keys
+        light_members = light_groups.get(group_key)
+        if light_members is None:
+            prefix, _, arg = group_key.partition("_")
+            if prefix == "kind" and arg != "EMISSIVE":
+                light_members = [obj for obj in enabled_lights if _light_kind(obj) == arg]
+
+        if light_members is not None:
+            for obj in light_members:
+                objects_in_group.append(obj)
+                if name_ok(obj.name):
+                    objects_to_select.append(obj)
+        elif group_key in _EMISSIVE_GROUP_SELECTION:
+            want_selected = _EMISSIVE_GROUP_SELECTION[group_key]
+            for obj, mat, node in emissive_pairs:
+                if want_selected is not None and obj.select_get() != want_selected:
+                    continue
+                if name_ok(obj.name, mat.name):
+                    objects_in_group.append(obj)
+                    objects_to_select.append(obj)
+        elif prefix == "coll":
+            if arg == "No Collection":
+                members = unparented_candidates
+            else:
+                collection = bpy.data.collections.get(arg)
+                members = [
+                    obj for obj in collection.all_objects
+                    if obj.type == 'LIGHT' or is_emissive_mesh(obj)
+                ] if collection else []
+            for obj in members:
+                objects_in_group.append(obj)
+                if name_ok(obj.name) and (obj.type != 'LIGHT' or obj.light_enabled):
+                    objects_to_select.append(obj)
+
         # --- Determine Action: Select or Deselect All ---
-        selected_objects = [obj for obj in objects_in_group if obj.name in context.view_layer.objects and obj.select_get()]
-        if objects_in_group and all(obj.select_get() for obj in objects_in_group if obj.name in context.view_layer.objects):
+        vl_objects = context.view_layer.objects
+        # One view layer lookup per group member; objects_to_select is a subset
+        in_layer = {obj.name for obj in objects_in_group if vl_objects.get(obj.name) is not None}
+        if objects_in_group and all(obj.select_get() for obj in objects_in_group if obj.name in in_layer):
             deselect_all_flag = True
 
         # --- Perform Action ---
+        # Only touch objects whose selection state actually changes
         any_selected = False
+        previous_active = vl_objects.active
+        currently_selected = context.selected_objects
         if deselect_all_flag:
-            bpy.ops.object.select_all(action='DESELECT')
-            self.report({'INFO'}, f"Deselected all objects in group: {self.group_key}")
+            for obj in currently_selected:
+                obj.select_set(False)
+            self.report({'INFO'}, f"Deselected all objects in group: {group_key}")
         else:
-            bpy.ops.object.select_all(action='DESELECT')
-            for obj in objects_to_select:
-                if obj.name in context.view_layer.objects:
+            targets = [obj for obj in objects_to_select if obj.name in in_layer]
+            target_names = {obj.name for obj in targets}
+            for obj in currently_selected:
+                if obj.name not in target_names:
+                    obj.select_set(False)
+            for obj in targets:
+                if not obj.select_get():
                     obj.select_set(True)
-                    any_selected = True
-                    if not context.view_layer.objects.active:
-                        context.view_layer.objects.active = obj
+            any_selected = bool(targets)
+            if any_selected and not vl_objects.active:
+                vl_objects.active = targets[0]
             if any_selected:
-                self.report({'INFO'}, f"Selected {len(objects_to_select)} objects in group: {self.group_key}")
+                self.report({'INFO'}, f"Selected {len(objects_to_select)} objects in group: {group_key}")
             else:
-                self.report({'INFO'}, f"No selectable objects found in group: {self.group_key}")
+                self.report({'INFO'}, f"No selectable objects found in group: {group_key}")
 
-        # Redraw the UI to update icons
-        for area in context.screen.areas:
-            if area.type in ('VIEW_3D', 'NODE_EDITOR', 'PROPERTIES'):
-                area.tag_redraw()
+        # Redraw the UI to update icons; node editors only follow the active object
+        if vl_objects.active != previous_active:
+            _tag_redraw(context)
+        else:
+            _tag_redraw(context, _V3D_AND_PROPERTIES)
 
         return {'FINISHED'}
                         
@@ -1086,7 +1327,8 @@ class LE_OT_ToggleEmission(bpy.types.Operator):
         nt = mat.node_tree
 
         # Debug: log call context
-        print(f"LE_OT_ToggleEmission called for material {self.mat_name}, node_name='{self.node_name}'")
+        if _DEBUG:
+            print(f"LE_OT_ToggleEmission called for material {self.mat_name}, node_name='{self.node_name}'")
 
         # Determine nodes to toggle
         if self.node_name.strip():
@@ -1099,51 +1341,55 @@ class LE_OT_ToggleEmission(bpy.types.Operator):
         else:
             # Main row: toggle all emissive nodes
             nodes_to_toggle = [
-                n for n in nt.nodes
-                if n.type in {'EMISSION', 'BSDF_PRINCIPLED'}
-                and (n.inputs.get("Strength") or n.inputs.get("Emission Strength"))
+                n for n in get_tree_emissive_nodes(nt)
+                if _emit_strength(n)
             ]
             if not nodes_to_toggle:
                 self.report({'WARNING'}, f"No emissive nodes found in material {self.mat_name}")
                 return {'CANCELLED'}
 
+        # Resolve each node's strength socket once and index the tree's links in one scan
+        node_sockets = [(node, _emit_strength(node)) for node in nodes_to_toggle]
+        links = _index_node_links(nt)
+
         # Debug: log nodes and their initial states
-        print(f"Toggling {len(nodes_to_toggle)} nodes: {[(n.name, n.type) for n in nodes_to_toggle]}")
-        for node in nodes_to_toggle:
-            strength_socket = node.inputs.get("Strength") if node.type == 'EMISSION' else node.inputs.get("Emission Strength")
-            print(f"Node {node.name}: linked={strength_socket.is_linked}, value={strength_socket.default_value if not strength_socket.is_linked else 'N/A'}")
+        if _DEBUG:
+            print(f"Toggling {len(nodes_to_toggle)} nodes: {[(n.name, n.type) for n in nodes_to_toggle]}")
+            for node, strength_socket in node_sockets:
+                if strength_socket:
+                    print(f"Node {node.name}: linked={strength_socket.is_linked}, value={strength_socket.default_value if not strength_socket.is_linked else 'N/A'}")
 
-        # Initialize backup storage
-        if mat.name not in _emissive_link_backup:
-            _emissive_link_backup[mat.name] = {}
-        store = _emissive_link_backup[mat.name]
+        store = _emissive_link_backup
 
         # Check if material is on
         is_on = any(
-            (n.inputs.get("Strength") or n.inputs.get("Emission Strength")).is_linked or
-            (n.inputs.get("Strength") or n.inputs.get("Emission Strength")).default_value > 0
-            for n in nodes_to_toggle
+            s in links or s.default_value > 0
+            for _, s in node_sockets if s
         )
-        print(f"Material {self.mat_name} is_on={is_on}")
+        if _DEBUG:
+            print(f"Material {self.mat_name} is_on={is_on}")
 
-        # Toggle nodes
-        for node in nodes_to_toggle:
-            strength_socket = node.inputs.get("Strength") if node.type == 'EMISSION' else node.inputs.get("Emission Strength")
+        # Toggle nodes; strength links are removed together after the backup pass
+        links_to_remove = []
+        for node, strength_socket in node_sockets:
             if not strength_socket:
-                print(f"Skipping node {node.name}: no Strength/Emission Strength input")
+                if _DEBUG:
+                    print(f"Skipping node {node.name}: no Strength/Emission Strength input")
                 continue
-            key = f"{mat.name}:{node.name}:Strength"
+            key = (mat.name, node.name)
             if is_on:
                 # Turn off: store state and set to 0
-                if strength_socket.is_linked and strength_socket.links:
-                    link = strength_socket.links[0]
+                link = links.get(strength_socket)
+                if link:
                     store[key] = ('LINK', link.from_node.name, link.from_socket.name)
-                    nt.links.remove(link)
-                    print(f"Stored link for {node.name}: {link.from_node.name}.{link.from_socket.name}")
+                    links_to_remove.append(link)
+                    if _DEBUG:
+                        print(f"Stored link for {node.name}: {link.from_node.name}.{link.from_socket.name}")
                 else:
                     store[key] = ('VALUE', strength_socket.default_value)
                     strength_socket.default_value = 0
-                    print(f"Stored value for {node.name}: {strength_socket.default_value}")
+                    if _DEBUG:
+                        print(f"Stored value for {node.name}: {strength_socket.default_value}")
             else:
                 # Turn on: restore state or set to 1.0
                 if key in store:
@@ -1153,56 +1399,28 @@ class LE_OT_ToggleEmission(bpy.types.Operator):
                         from_socket = from_node.outputs.get(data[1]) if from_node else None
                         if from_socket:
                             nt.links.new(from_socket, strength_socket)
-                            print(f"Restored link for {node.name}: {data[0]}.{data[1]}")
+                            if _DEBUG:
+                                print(f"Restored link for {node.name}: {data[0]}.{data[1]}")
                         else:
-                            print(f"Failed to restore link for {node.name}: node/socket not found")
+                            if _DEBUG:
+                                print(f"Failed to restore link for {node.name}: node/socket not found")
                     else:
                         strength_socket.default_value = data[0]
-                        print(f"Restored value for {node.name}: {data[0]}")
+                        if _DEBUG:
+                            print(f"Restored value for {node.name}: {data[0]}")
                     del store[key]
                 else:
                     strength_socket.default_value = 1.0
-                    print(f"No backup for {node.name}, set to 1.0")
-
-        # Clean up empty backup
-        if not store:
-            _emissive_link_backup.pop(mat.name, None)
+                    if _DEBUG:
+                        print(f"No backup for {node.name}, set to 1.0")
 
-        # Debug: log final backup state
-        print(f"Backup for {mat.name}: {store}")
+        for link in links_to_remove:
+            nt.links.remove(link)
 
         # Redraw UI
-        for area in context.screen.areas:
-            if area.type in {'VIEW_3D', 'NODE_EDITOR', 'PROPERTIES'}:
-                area.tag_redraw()
+        _tag_redraw(context, node_tree=nt)
         return {'FINISHED'}
     
-def _disable_material_node(self, mat, node):
-    global _emissive_link_backup
-    if not node or not mat.use_nodes:
-        return
-    nt = mat.node_tree
-
-    strength = node.inputs.get("Strength") if node.type == 'EMISSION' else node.inputs.get("Emission Strength")
-    color = node.inputs.get("Color") if node.type == 'EMISSION' else node.inputs.get("Emission Color")
-    socket = strength or color
-    if not socket:
-        return
-
-    key = f"{mat.name}:{node.name}:{socket.name}"
-
-    if socket.is_linked and socket.links:
-        link = socket.links[0]
-        _emissive_link_backup[key] = ('LINK', node.name, socket.name, link.from_node.name, link.from_socket.name)
-        nt.links.remove(link)
-    else:
-        if socket.name == "Color":
-            _emissive_link_backup[key] = ('VALUE', node.name, socket.name, tuple(socket.default_value[:]))
-            socket.default_value = (0, 0, 0, 1)
-        else:
-            _emissive_link_backup[key] = ('VALUE', node.name, socket.name, socket.default_value)
-            socket.default_value = 0
-    
 class LE_OT_isolate_emissive(bpy.types.Operator):
     """Toggle isolation of emissive nodes—or entire material if node_name == ""."""
     bl_idname = "le.isolate_emissive"
@@ -1236,25 +1454,27 @@ class EMISSIVE_OT_ToggleGroupAllOff(bpy.types.Operator):
 
     def execute(self, context):
         global group_mat_checkbox_state, _emissive_link_backup
+        group_key = sys.intern(self.group_key)
 
-        is_on = group_mat_checkbox_state.get(self.group_key, True)
+        is_on = group_mat_checkbox_state.get(group_key, True)
         emissive_pairs = find_emissive_objects(context)
         filtered_pairs = []
-        seen_materials = set()
+        seen_materials = set()  # RNA structs hash and compare by pointer
 
         # Filter based on group_key
-        if self.group_key.startswith("emissive_"):
-            coll_name = self.group_key[9:]
+        if group_key.startswith("emissive_"):
+            coll_name = group_key[9:]
             for obj, mat, node in emissive_pairs:
-                if obj.users_collection and obj.users_collection[0].name == coll_name:
-                    if mat.name not in seen_materials:
+                users_collection = obj.users_collection
+                if users_collection and users_collection[0].name == coll_name:
+                    if mat not in seen_materials:
                         filtered_pairs.append((obj, mat, node))
-                        seen_materials.add(mat.name)
-        elif self.group_key in ("kind_EMISSIVE", "all_emissives_alpha"):
+                        seen_materials.add(mat)
+        elif group_key in ("kind_EMISSIVE", "all_emissives_alpha"):
             for obj, mat, node in emissive_pairs:
-                if mat.name not in seen_materials:
+                if mat not in seen_materials:
                     filtered_pairs.append((obj, mat, node))
-                    seen_materials.add(mat.name)
+                    seen_materials.add(mat)
 
         # Toggle materials
         for obj, mat, node in filtered_pairs:
@@ -1262,30 +1482,24 @@ class EMISSIVE_OT_ToggleGroupAllOff(bpy.types.Operator):
                 continue
             nt = mat.node_tree
 
-            # Group nodes by material for this specific pair
-            material_nodes = [n for n in nt.nodes if n.type in {'EMISSION', 'BSDF_PRINCIPLED'}]
+            # Group nodes by material for this specific pair, resolving each strength socket once
             emissive_nodes = []
-            for n in material_nodes:
-                strength_socket = n.inputs.get("Strength") if n.type == 'EMISSION' else n.inputs.get("Emission Strength")
+            for n in get_tree_emissive_nodes(nt):
+                strength_socket = _emit_strength(n)
                 if strength_socket:
-                    emissive_nodes.append(n)
+                    emissive_nodes.append((n, strength_socket))
 
             if not emissive_nodes:
                 continue
 
-            key = mat.name
             if is_on:
                 # --- Turn OFF ---
-                if mat.name not in _emissive_link_backup:
-                    _emissive_link_backup[mat.name] = {}
-                store = _emissive_link_backup[mat.name]
-
-                for node in emissive_nodes:
-                    strength_socket = node.inputs.get("Strength") if node.type == 'EMISSION' else node.inputs.get("Emission Strength")
+                store = _emissive_link_backup
 
+                for node, strength_socket in emissive_nodes:
                     # Handle Strength only
                     if strength_socket:
-                        s_key = f"{node.name}:Strength"
+                        s_key = (mat.name, node.name)
                         if strength_socket.is_linked:
                             link = strength_socket.links[0]
                             store[s_key] = ('LINK', link.from_node.name, link.from_socket.name)
@@ -1296,38 +1510,27 @@ class EMISSIVE_OT_ToggleGroupAllOff(bpy.types.Operator):
 
             else:
                 # --- Turn ON ---
-                if mat.name in _emissive_link_backup:
-                    store = _emissive_link_backup[mat.name]
-                    for node in emissive_nodes:
-                        strength_socket = node.inputs.get("Strength") if node.type == 'EMISSION' else node.inputs.get("Emission Strength")
-
-                        # Restore Strength only
-                        if strength_socket:
-                            s_key = f"{node.name}:Strength"
-                            if s_key in store:
-                                data = store[s_key]
-                                if data[0] == 'LINK':
-                                    from_node_name, from_socket_name = data[1], data[2]
-                                    from_node = nt.nodes.get(from_node_name)
-                                    if from_node:
-                                        from_socket = from_node.outputs.get(from_socket_name)
-                                        if from_socket:
-                                            nt.links.new(from_socket, strength_socket)
-                                elif data[0] == 'VALUE':
-                                    strength_socket.default_value = data[1]
-                                # Remove the key from the store after restoration
-                                del store[s_key]
-
-                    # If the store for this material is empty, remove the material entry
-                    if not store:
-                        del _emissive_link_backup[mat.name]
-
-        group_mat_checkbox_state[self.group_key] = not is_on
+                store = _emissive_link_backup
+                for node, strength_socket in emissive_nodes:
+                    # Restore Strength only
+                    if strength_socket:
+                        s_key = (mat.name, node.name)
+                        if s_key in store:
+                            data = store.pop(s_key)
+                            if data[0] == 'LINK':
+                                from_node_name, from_socket_name = data[1], data[2]
+                                from_node = nt.nodes.get(from_node_name)
+                                if from_node:
+                                    from_socket = from_node.outputs.get(from_socket_name)
+                                    if from_socket:
+                                        nt.links.new(from_socket, strength_socket)
+                            elif data[0] == 'VALUE':
+                                strength_socket.default_value = data[1]
+
+        group_mat_checkbox_state[group_key] = not is_on
 
         # Request UI Redraw
-        for area in context.screen.areas:
-            if area.type in ('VIEW_3D', 'NODE_EDITOR', 'PROPERTIES'):
-                area.tag_redraw()
+        _tag_redraw(context)
 
         return {'FINISHED'}
     
@@ -1338,10 +1541,9 @@ class LIGHT_OT_ToggleGroup(bpy.types.Operator):
     group_key: bpy.props.StringProperty()
 
     def execute(self, context):
-        group_collapse_dict[self.group_key] = not group_collapse_dict.get(self.group_key, False)
-        for area in context.screen.areas:
-            if area.type in {'VIEW_3D', 'NODE_EDITOR', 'PROPERTIES'}:
-                area.tag_redraw()
+        group_key = sys.intern(self.group_key)
+        group_collapse_dict[group_key] = not group_collapse_dict.get(group_key, False)
+        _tag_redraw(context)
         return {'FINISHED'}
 
 class LIGHT_OT_ToggleCollection(bpy.types.Operator):
@@ -1370,6 +1572,8 @@ class LIGHT_OT_ToggleCollection(bpy.types.Operator):
             return {'CANCELLED'}
 
         layer_collection = get_layer_collection_by_name(context.view_layer.layer_collection, coll_name)
+        # Reused by execute when it runs on this same operator instance
+        self._layer_collection = (context.view_layer.as_pointer(), coll_name, layer_collection)
         has_meshes = any(obj.type == 'MESH' for obj in collection.all_objects)
 
         # If it has meshes and is not excluded, show the dialog
@@ -1393,45 +1597,39 @@ class LIGHT_OT_ToggleCollection(bpy.types.Operator):
         if not collection:
             return {'CANCELLED'}
 
-        layer_collection = get_layer_collection_by_name(context.view_layer.layer_collection, coll_name)
+        cached = getattr(self, "_layer_collection", None)
+        if cached and cached[:2] == (context.view_layer.as_pointer(), coll_name):
+            layer_collection = cached[2]
+        else:
+            layer_collection = get_layer_collection_by_name(context.view_layer.layer_collection, coll_name)
         if not layer_collection:
              return {'CANCELLED'}
 
         # Perform action based on the 'action' property
         if self.action == 'EXCLUDE':
-            def toggle_exclusion_recursive(lc, exclude):
-                lc.exclude = exclude
-                for child in lc.children:
-                    toggle_exclusion_recursive(child, exclude)
-
             # Toggle the exclusion state
-            new_exclude_state = not layer_collection.exclude
-            toggle_exclusion_recursive(layer_collection, new_exclude_state)
+            set_exclude_recursive(layer_collection, not layer_collection.exclude)
 
         elif self.action == 'TURN_OFF_LIGHTS':
-            for obj in collection.all_objects:
-                if obj.type == 'LIGHT':
+            lights_in_coll = [obj for obj in collection.all_objects if obj.type == 'LIGHT']
+            for obj in lights_in_coll:
+                # update_light_enabled hides the light; only touch flags that still differ
+                if obj.light_enabled:
                     obj.light_enabled = False
+                if not obj.hide_viewport:
                     obj.hide_viewport = True
+                if not obj.hide_render:
                     obj.hide_render = True
 
         # Redraw
-        for area in context.screen.areas:
-            if area.type == 'VIEW_3D':
-                area.tag_redraw()
+        _tag_redraw(context, _V3D_ONLY)
         # Returning FINISHED here will close the dialog invoked by invoke_props_dialog
         return {'FINISHED'}
 
     def exclude_collection(self, context, collection, layer_collection):
-        def toggle_exclusion_recursive(lc, exclude):
-            lc.exclude = exclude
-            for child in lc.children:
-                toggle_exclusion_recursive(child, exclude)
-        toggle_exclusion_recursive(layer_collection, not layer_collection.exclude)
+        set_exclude_recursive(layer_collection, not layer_collection.exclude)
 
-        for area in context.screen.areas:
-            if area.type == 'VIEW_3D':
-                area.tag_redraw()
+        _tag_redraw(context, _V3D_ONLY)
         return {'FINISHED'}
 
 class EMISSIVE_OT_IsolateGroup(bpy.types.Operator):
@@ -1442,22 +1640,25 @@ class EMISSIVE_OT_IsolateGroup(bpy.types.Operator):
 
     def execute(self, context):
         global group_checkbox_2_state
-        is_currently_active = group_checkbox_2_state.get(self.group_key, False)
-        to_keep_emissive = set()
-        emissive_pairs = find_emissive_objects(context)
-        if self.group_key.startswith("emissive_"):
-            coll_name = self.group_key[9:]
-            for obj, mat, node in emissive_pairs:
-                if obj.users_collection and obj.users_collection[0].name == coll_name:
-                    to_keep_emissive.add(mat.name)
-        elif self.group_key in ("kind_EMISSIVE", "all_emissives_alpha"):
-            for obj, mat, node in emissive_pairs:
-                to_keep_emissive.add(mat.name)
+        group_key = sys.intern(self.group_key)
+        is_currently_active = group_checkbox_2_state.get(group_key, False)
         if not is_currently_active:
-            group_checkbox_2_state[self.group_key] = True
+            # Only activation needs the group's members
+            to_keep_emissive = set()
+            emissive_pairs = find_emissive_objects(context)
+            if group_key.startswith("emissive_"):
+                coll_name = group_key[9:]
+                for obj, mat, node in emissive_pairs:
+                    users_collection = obj.users_collection
+                    if users_collection and users_collection[0].name == coll_name:
+                        to_keep_emissive.add(mat.name)
+            elif group_key in ("kind_EMISSIVE", "all_emissives_alpha"):
+                for obj, mat, node in emissive_pairs:
+                    to_keep_emissive.add(mat.name)
+            group_checkbox_2_state[group_key] = True
             _unified_isolate_manager.activate(context, UnifiedIsolateMode.MATERIAL_GROUP, identifier=(set(), to_keep_emissive))
         else:
-            group_checkbox_2_state[self.group_key] = False
+            group_checkbox_2_state[group_key] = False
             if _unified_isolate_manager.is_active(UnifiedIsolateMode.MATERIAL_GROUP):
                 _unified_isolate_manager.deactivate(context)
         return {'FINISHED'}
@@ -1470,39 +1671,44 @@ class LIGHT_OT_ToggleKind(bpy.types.Operator):
 
     def execute(self, context):
         global group_checkbox_1_state, group_lights_original_state
-        is_on = group_checkbox_1_state.get(self.group_key, True)
-        group_objs = self._get_group_objects(context, self.group_key)
+        group_key = sys.intern(self.group_key)
+        is_on = group_checkbox_1_state.get(group_key, True)
+        group_objs = self._get_group_objects(context, group_key)
         if is_on:
             original_states = {}
             for obj in group_objs:
                 if obj.type == 'LIGHT':
-                    original_states[obj.name] = obj.light_enabled
-                    obj.light_enabled = False
-            group_lights_original_state[self.group_key] = original_states
+                    enabled = obj.light_enabled
+                    original_states[obj.name] = enabled
+                    if enabled:
+                        obj.light_enabled = False
+            group_lights_original_state[group_key] = original_states
         else:
-            original_states = group_lights_original_state.get(self.group_key, {})
+            original_states = group_lights_original_state.pop(group_key, {})
             for obj in group_objs:
                 if obj.type == 'LIGHT':
-                    obj.light_enabled = original_states.get(obj.name, True)
-            if self.group_key in group_lights_original_state:
-                del group_lights_original_state[self.group_key]
-        group_checkbox_1_state[self.group_key] = not is_on
-        for area in context.screen.areas:
-            if area.type == 'VIEW_3D':
-                area.tag_redraw()
+                    enabled = original_states.get(obj.name, True)
+                    if obj.light_enabled != enabled:
+                        obj.light_enabled = enabled
+        group_checkbox_1_state[group_key] = not is_on
+        _tag_redraw(context, _V3D_ONLY)
         return {'FINISHED'}
 
     def _get_group_objects(self, context, group_key):
-        filter_pattern = context.scene.light_editor_filter.lower()
-        all_lights = [obj for obj in context.view_layer.objects if obj.type == 'LIGHT']
-        if filter_pattern:
-            all_lights = [obj for obj in all_lights if re.search(filter_pattern, obj.name, re.I)]
         if group_key == "all_lights_alpha":
-            return all_lights
-        if group_key.startswith("kind_"):
+            kind = None
+        elif group_key.startswith("kind_"):
             kind = group_key[5:]
-            return [obj for obj in all_lights if obj.data.type == kind]
-        return []
+        else:
+            return []
+        if kind is None:
+            group_lights = get_view_layer_lights(context.view_layer)
+        else:
+            group_lights = get_view_layer_lights_by_kind(context.view_layer).get(kind, ())
+        match = _filter_matcher(context.scene.light_editor_filter)
+        if match is None:
+            return list(group_lights)
+        return [obj for obj in group_lights if match(obj.name)]
 
 class LE_OT_toggle_env_socket(bpy.types.Operator):
     """Toggle the connection of an environment input socket (Surface/Volume)."""
@@ -1511,13 +1717,12 @@ class LE_OT_toggle_env_socket(bpy.types.Operator):
     socket_name: bpy.props.StringProperty()
 
     def execute(self, context):
-        global _surface_link_backup, _volume_link_backup
         world = context.scene.world
         if not world or not world.use_nodes:
             self.report({'WARNING'}, "No world with nodes found")
             return {'CANCELLED'}
         nt = world.node_tree
-        output_node = next((n for n in nt.nodes if n.type == 'OUTPUT_WORLD'), None)
+        output_node = get_node_of_type(nt, 'OUTPUT_WORLD')
         if not output_node:
             self.report({'WARNING'}, "No World Output node")
             return {'CANCELLED'}
@@ -1530,15 +1735,11 @@ class LE_OT_toggle_env_socket(bpy.types.Operator):
             from_socket = link.from_socket
             from_node = link.from_node
             nt.links.remove(link)
-            if self.socket_name == "Surface":
-                _surface_link_backup = (from_node.name, from_socket.name)
-            else:
-                _volume_link_backup = (from_node.name, from_socket.name)
+            _env_link_backup[self.socket_name] = (from_node.name, from_socket.name)
         else:
-            if self.socket_name == "Surface" and _surface_link_backup:
-                node_name, socket_name = _surface_link_backup
-            elif self.socket_name == "Volume" and _volume_link_backup:
-                node_name, socket_name = _volume_link_backup
+            backup = _env_link_backup.get(self.socket_name)
+            if backup:
+                node_name, socket_name = backup
             else:
                 self.report({'INFO'}, f"No stored connection for {self.socket_name}")
                 return {'CANCELLED'}
@@ -1548,11 +1749,54 @@ class LE_OT_toggle_env_socket(bpy.types.Operator):
                 nt.links.new(from_socket, socket)
             else:
                 self.report({'WARNING'}, f"Stored node/socket not found for {self.socket_name}")
-        for area in context.screen.areas:
-            if area.type == 'NODE_EDITOR':
-                area.tag_redraw()
+        _tag_redraw(context, _NODE_EDITOR_ONLY)
         return {'FINISHED'}
 
+def _group_collection_names(obj):
+    """Collection group names an object is listed under ("No Collection" if unparented)."""
+    users_collection = obj.users_collection
+    if len(users_collection) == 1 and users_collection[0].name == "Scene Collection":
+        return ("No Collection",)
+    return [coll.name for coll in users_collection]
+
+def _collect_group_members(context, group_key):
+    """Light names and emissive material names belonging to an isolate group."""
+    # Index lights and emissive materials by collection and kind in one pass
+    lights_by_coll = defaultdict(set)
+    lights_by_kind = defaultdict(set)
+    mats_by_coll = defaultdict(set)
+    all_lights = set()
+    for obj in context.view_layer.objects:
+        if obj.type == 'LIGHT':
+            all_lights.add(obj.name)
+            lights_by_kind[_light_kind(obj)].add(obj.name)
+            for coll_name in _group_collection_names(obj):
+                lights_by_coll[coll_name].add(obj.name)
+    emissive_pairs = find_emissive_objects(context)
+    all_mats = {mat.name for _, mat, _ in emissive_pairs}
+    obj_coll_names = {}  # An object appears once per emissive node
+    for obj, mat, _ in emissive_pairs:
+        coll_names = obj_coll_names.get(obj.name)
+        if coll_names is None:
+            coll_names = obj_coll_names[obj.name] = _group_collection_names(obj)
+        for coll_name in coll_names:
+            mats_by_coll[coll_name].add(mat.name)
+
+    prefix, _, arg = group_key.partition("_")
+    if prefix == "coll":
+        return lights_by_coll[arg], mats_by_coll[arg]
+    if prefix == "kind":
+        if arg == "EMISSIVE":
+            # Emissive Materials Kind group header
+            return set(), all_mats
+        # Standard Light Kind group headers (POINT, SUN, etc.)
+        return lights_by_kind[arg], set()
+    if group_key == "all_lights_alpha":
+        return all_lights, set()
+    if group_key == "all_emissives_alpha":
+        return set(), all_mats
+    return set(), set()
+
 class LIGHT_OT_ToggleGroupExclusive(bpy.types.Operator):
     """Toggle exclusive isolation for a group of lights and emissives."""
     bl_idname = "light_editor.toggle_group_exclusive"
@@ -1561,53 +1805,15 @@ class LIGHT_OT_ToggleGroupExclusive(bpy.types.Operator):
 
     def execute(self, context):
         global group_checkbox_2_state # Access global state
+        group_key = sys.intern(self.group_key)
         # --- 1. Determine New State ---
-        is_currently_active = group_checkbox_2_state.get(self.group_key, False)
+        is_currently_active = group_checkbox_2_state.get(group_key, False)
         new_state = not is_currently_active
         # --- 2. Handle Activation/Deactivation using UnifiedIsolateManager ---
         if new_state:
             # --- Activate Isolation ---
             # a. Determine members of the group
-            to_keep_enabled = set() # For light object names
-            to_keep_emissive = set() # For material names
-            lights = [obj for obj in context.view_layer.objects if obj.type == 'LIGHT']
-            # find_emissive_objects must be defined before this point
-            emissive_pairs = find_emissive_objects(context)
-            if self.group_key.startswith("coll_"):
-                coll_name = self.group_key[5:]
-                if coll_name == "No Collection":
-                    for obj in lights:
-                        if len(obj.users_collection) == 1 and obj.users_collection[0].name == "Scene Collection":
-                            to_keep_enabled.add(obj.name)
-                    for obj, mat in emissive_pairs:
-                         if len(obj.users_collection) == 1 and obj.users_collection[0].name == "Scene Collection":
-                            to_keep_emissive.add(mat.name)
-                else:
-                    for obj in lights:
-                        if any(coll.name == coll_name for coll in obj.users_collection):
-                            to_keep_enabled.add(obj.name)
-                    for obj, mat in emissive_pairs:
-                        if any(coll.name == coll_name for coll in obj.users_collection):
-                            to_keep_emissive.add(mat.name)
-            elif self.group_key.startswith("kind_"):
-                kind = self.group_key[5:]
-                if kind == "EMISSIVE":
-                    # This case is for the Emissive Materials Kind group header
-                    for obj, mat in emissive_pairs:
-                        to_keep_emissive.add(mat.name)
-                else:
-                    # This case is for standard Light Kind group headers (POINT, SUN, etc.)
-                    for obj in lights:
-                        if obj.data.type == kind:
-                            to_keep_enabled.add(obj.name)
-            elif self.group_key == "all_lights_alpha":
-                # All Lights group
-                for obj in lights:
-                    to_keep_enabled.add(obj.name)
-            elif self.group_key == "all_emissives_alpha":
-                 # All Emissive Materials group
-                 for obj, mat in emissive_pairs:
-                    to_keep_emissive.add(mat.name)
+            to_keep_enabled, to_keep_emissive = _collect_group_members(context, group_key)
             # b. Activate the unified isolate manager for LIGHT_GROUP mode
             # Pass the sets of lights and emissives to keep enabled
             _unified_isolate_manager.activate(
@@ -1625,11 +1831,9 @@ class LIGHT_OT_ToggleGroupExclusive(bpy.types.Operator):
             # If it wasn't active or was a different mode, deactivating is a safe no-op for the manager.
             # We still proceed to update the UI state flag.
         # --- 3. Update Global UI State Flag ---
-        group_checkbox_2_state[self.group_key] = new_state
+        group_checkbox_2_state[group_key] = new_state
         # --- 4. Request UI Redraw ---
-        for area in context.screen.areas:
-            if area.type in ('VIEW_3D', 'NODE_EDITOR'):
-                area.tag_redraw()
+        _tag_redraw(context, _V3D_AND_NODE_EDITOR)
         return {'FINISHED'}
 
 class LIGHT_OT_ClearFilter(bpy.types.Operator):
@@ -1661,10 +1865,12 @@ class LIGHT_OT_SelectLight(bpy.types.Operator):
         if self.name in vob:
             light = vob[self.name]
             if light.select_get():
-                bpy.ops.object.select_all(action='DESELECT')
+                for o in list(vob.selected):
+                    o.select_set(False)
                 self.report({'INFO'}, f"Deselected all objects")
             else:
-                bpy.ops.object.select_all(action='DESELECT')
+                for o in list(vob.selected):
+                    o.select_set(False)
                 light.select_set(True)
                 vob.active = light
                 self.report({'INFO'}, f"Selected light: {self.name}")
@@ -1717,14 +1923,29 @@ def node_tree_has_linked_emission_inputs(ntree):
 
 def group_emissive_by_material(pairs):
     """Group emissive objects by material and object, preserving node information."""
-    from collections import defaultdict
-    grouped = defaultdict(list)
+    grouped = {}
     for obj, mat, node in pairs:
         key = (obj.name, mat.name)
-        grouped[key].append(node)
-    result = [(bpy.data.objects[obj_name], bpy.data.materials[mat_name], nodes)
-              for (obj_name, mat_name), nodes in grouped.items()]
-    return result
+        entry = grouped.get(key)
+        if entry is None:
+            grouped[key] = (obj, mat, [node])
+        else:
+            entry[2].append(node)
+    return list(grouped.values())
+
+# (source pairs, grouped rows sorted by object/material name) from the last panel draw
+_grouped_emissive = [None, None]
+
+def group_sorted_emissives(pairs):
+    """Group emissive pairs and sort the rows by name, reusing the last result."""
+    # filter_emissive_pairs hands back the same list until the cache is invalidated
+    if _grouped_emissive[0] is pairs:
+        return _grouped_emissive[1]
+    grouped = group_emissive_by_material(pairs)
+    # Tuple keys compare object names first without building a combined string
+    grouped.sort(key=lambda x: (x[0].name.casefold(), x[1].name.casefold()))
+    _grouped_emissive[:] = (pairs, grouped)
+    return grouped
 
 def draw_emissive_grouped_by_ntree(scene, container_box, emissive_pairs):
     """Group and display emissive materials by shared node trees with collapsible sections."""
@@ -1877,9 +2098,10 @@ def draw_emissive_node_row(box, obj, mat, node):
         col_strength.label(text="")
 
 
-def draw_main_row(box, obj):
+def draw_main_row(box, obj, selected_names=None):
     """Draw a single light object row in the UI, with equal-width color/strength/exposure fields."""
     light = obj.data
+    use_nodes = light.use_nodes
     row = box.row(align=True)
 
     # --- On/Off, Exclusive, Select, Expand ---
@@ -1888,10 +2110,11 @@ def draw_main_row(box, obj):
                   icon="OUTLINER_OB_LIGHT" if obj.light_enabled else "LIGHT_DATA")
     controls.prop(obj, "light_turn_off_others", text="",
                   icon="RADIOBUT_ON" if obj.light_turn_off_others else "RADIOBUT_OFF")
+    is_selected = obj.name in selected_names if selected_names is not None else obj.select_get()
     controls.operator("le.select_light", text="",
-                      icon="RESTRICT_SELECT_ON" if obj.select_get() else "RESTRICT_SELECT_OFF").name = obj.name
+                      icon="RESTRICT_SELECT_ON" if is_selected else "RESTRICT_SELECT_OFF").name = obj.name
     exp = controls.row(align=True)
-    exp.enabled = not light.use_nodes
+    exp.enabled = not use_nodes
     exp.prop(obj, "light_expanded", text="",
              emboss=True,
              icon='DOWNARROW_HLT' if obj.light_expanded else 'RIGHTARROW')
@@ -1912,16 +2135,13 @@ def draw_main_row(box, obj):
     col_strength.ui_units_x = uniform_width
     col_exposure.ui_units_x = uniform_width
 
-    if light.use_nodes:
-        nt = light.node_tree
-        output_node = next((n for n in nt.nodes if n.type == 'OUTPUT_LIGHT'), None)
-        surface_in = output_node.inputs.get("Surface") if output_node else None
+    nt = light.node_tree if use_nodes else None
+    if nt is not None:
+        from_node = _surface_from_node(get_node_of_type(nt, 'OUTPUT_LIGHT'))
 
-        if surface_in and surface_in.is_linked:
-            from_node = surface_in.links[0].from_node
+        if from_node is not None:
             if from_node.type == 'EMISSION':
-                color_input = from_node.inputs.get("Color")
-                strength_input = from_node.inputs.get("Strength")
+                strength_input, color_input = _emit_sockets(from_node)
 
                 # — Color —
                 if color_input:
@@ -1960,13 +2180,38 @@ def draw_main_row(box, obj):
         col_strength.prop(light, "energy", text="")
 
     # --- Exposure / dummy field ---
-    if hasattr(light, "exposure"):
+    if _LIGHT_HAS_EXPOSURE:
         col_exposure.prop(light, "exposure", text="Exp.")
     else:
         d = col_exposure.row(align=True)
         d.enabled = False
         d.label(text="")
 
+def draw_group_header(row, group_key, label, icon, toggle_op, checked, isolate_op, isolated, selected, collapsed):
+    """Draw a group header: on/off, isolate, select and collapse buttons, then the label.
+
+    Pass toggle_op=None when the caller draws its own on/off button.
+    """
+    if toggle_op:
+        row.operator(toggle_op, text="", icon='CHECKBOX_HLT' if checked else 'CHECKBOX_DEHLT',
+                     depress=checked).group_key = group_key
+    row.operator(isolate_op, text="", icon='RADIOBUT_ON' if isolated else 'RADIOBUT_OFF',
+                 depress=isolated).group_key = group_key
+    row.operator("le.select_group", text="",
+                 icon='RESTRICT_SELECT_ON' if selected else 'RESTRICT_SELECT_OFF').group_key = group_key
+    row.operator("light_editor.toggle_group", text="", emboss=True,
+                 icon='RIGHTARROW' if collapsed else 'DOWNARROW_HLT').group_key = group_key
+    row.label(text=label, icon=icon)
+
+def draw_light_rows(panel, box, lights, selected_names=None):
+    """Draw light rows into a box, with extra parameters under expanded non-node lights."""
+    for o in lights:
+        draw_main_row(box, o, selected_names)
+        if o.light_expanded:
+            light = o.data
+            if not light.use_nodes:
+                draw_extra_params(panel, box.box(), o, light)
+
 
 class LE_OT_IsolateEnvironment(bpy.types.Operator):
     """Isolate the environment lighting."""
@@ -1975,14 +2220,8 @@ class LE_OT_IsolateEnvironment(bpy.types.Operator):
     mode: bpy.props.StringProperty(default="HEADER")
 
     def execute(self, context):
-        global isolate_env_header_state, isolate_env_surface_state, isolate_env_volume_state
-        global env_isolated_ui_state  # Declare global at the start
+        global env_isolated_ui_state
 
-        flag_map = {
-            "HEADER": "isolate_env_header_state",
-            "SURFACE": "isolate_env_surface_state",
-            "VOLUME": "isolate_env_volume_state",
-        }
         mode_map = {
             "HEADER": UnifiedIsolateMode.ENVIRONMENT,
             "SURFACE": UnifiedIsolateMode.ENVIRONMENT_SURFACE,
@@ -1992,20 +2231,17 @@ class LE_OT_IsolateEnvironment(bpy.types.Operator):
         unified_mode = mode_map.get(self.mode, UnifiedIsolateMode.ENVIRONMENT)
         is_currently_active = _unified_isolate_manager.is_active(unified_mode)
 
+        _env_isolate_flags[self.mode] = not is_currently_active
+        if self.mode == "HEADER":
+            env_isolated_ui_state = not is_currently_active
         if not is_currently_active:
-            globals()[flag_map[self.mode]] = True
-            if self.mode == "HEADER":
-                env_isolated_ui_state = True  # Assign after global declaration
             _unified_isolate_manager.activate(context, unified_mode)
         else:
-            globals()[flag_map[self.mode]] = False
-            if self.mode == "HEADER":
-                env_isolated_ui_state = False  # Assign after global declaration
             _unified_isolate_manager.deactivate(context)
 
-        for area in context.screen.areas:
-            if area.type in {'VIEW_3D', 'NODE_EDITOR'}:
-                area.tag_redraw()
+        world = context.scene.world
+        _tag_redraw(context, _V3D_AND_NODE_EDITOR,
+                    node_tree=world.node_tree if world else None)
         return {'FINISHED'}
 
 class LIGHT_PT_editor(bpy.types.Panel):
@@ -2016,33 +2252,19 @@ class LIGHT_PT_editor(bpy.types.Panel):
     bl_region_type = "UI"
     bl_category = "Light Editor"
 
-    @classmethod
-    def poll(cls, context):
-        # Ensure any material with emission inputs is preloaded
-        for mat in bpy.data.materials:
-            if mat.use_nodes and mat.node_tree:
-                for node in mat.node_tree.nodes:
-                    if node.type in {'EMISSION', 'BSDF_PRINCIPLED'}:
-                        if node.type == 'EMISSION' and node.inputs.get("Color"):
-                            _ = node.inputs["Color"].default_value
-                        elif node.type == 'BSDF_PRINCIPLED':
-                            color_sock = node.inputs.get("Emission Color")
-                            strength_sock = node.inputs.get("Emission Strength")
-                            if color_sock:
-                                _ = color_sock.default_value
-                            if strength_sock:
-                                _ = strength_sock.default_value
-        return True
-
     def draw(self, context):
         layout = self.layout
         scene = context.scene
+        view_layer = context.view_layer
+        # Read once; the branches below compare against it
+        filter_type = scene.filter_light_types
+        filter_text = scene.light_editor_filter
 
         # --- 1. Filter Type Buttons ---
         layout.row().prop(scene, "filter_light_types", expand=True)
 
         # --- 2. Render Layer Selector ---
-        if len(context.scene.view_layers) > 1 and scene.filter_light_types == 'COLLECTION':
+        if filter_type == 'COLLECTION' and len(scene.view_layers) > 1:
             layout.prop(scene, "light_editor_selected_render_layer", text="Render Layer")
 
         # --- 3. Search Bar ---
@@ -2051,154 +2273,146 @@ class LIGHT_PT_editor(bpy.types.Panel):
         row = layout.row(align=True)
         row.prop(scene, "light_editor_filter", text="", icon="VIEWZOOM")
         row.operator("le.clear_light_filter", text="", icon='PANEL_CLOSE')
-        filter_str = scene.light_editor_filter.lower()
+        filter_str = filter_text.lower()
+        # Compiled once per filter text; None when the filter is empty
+        match = _filter_matcher(filter_text)
 
         # --- 4. Gather Lights and Emissive Nodes ---
         try:
-            lights = [o for o in context.view_layer.objects if o.type == 'LIGHT' and (not filter_str or re.search(filter_str, o.name, re.I))]
+            lights = [o for o in get_view_layer_lights(view_layer) if match is None or match(o.name)]
+            # Sorted once; the per-branch subsets below keep this order
+            lights.sort(key=lambda x: x.name.casefold())
         except Exception as e:
             layout.box().label(text=f"Error filtering lights: {e}", icon='ERROR')
             lights = []
         try:
             emissive_pairs = find_emissive_objects(context)
-            filtered_emissive_pairs = [(o, m, n) for o, m, n in emissive_pairs
-                                     if not filter_str or re.search(filter_str, o.name, re.I) or re.search(filter_str, m.name, re.I)]
+            filtered_emissive_pairs = filter_emissive_pairs(emissive_pairs, filter_text)
+            # Cached set; per-object "has an emissive material" tests are set lookups
+            emissive_mats = get_emissive_materials(emissive_pairs)
             if not emissive_pairs:
                 layout.box().label(text="No emissive materials detected", icon='INFO')
             elif not filtered_emissive_pairs:
                 layout.box().label(text="No emissive materials match filter", icon='INFO')
         except Exception as e:
             layout.box().label(text=f"Error detecting emissive materials: {e}", icon='ERROR')
-            filtered_emissive_pairs = []
+            emissive_pairs = filtered_emissive_pairs = []
+            emissive_mats = frozenset()
+        # (obj, mat, nodes) rows grouped and sorted once; branches below take
+        # order-preserving subsets of these
+        grouped_all = group_sorted_emissives(filtered_emissive_pairs)
+
+        # Selection state for every row, read once per draw
+        selected_names = {o.name for o in view_layer.objects.selected}
 
         def is_group_selected(group_key, objects):
             if not objects:
                 return False
-            return all(obj.select_get() for obj in objects if obj.name in context.view_layer.objects)
+            return all(obj.name in selected_names for obj in objects)
 
         # --- 5. Draw UI Based on Filter Type ---
-        if scene.filter_light_types == 'NO_FILTER':
+        if filter_type == 'NO_FILTER':
             ab = layout.box()
             ar = ab.row(align=True)
             key_a = "all_lights_alpha"
-            iA1 = 'CHECKBOX_HLT' if group_checkbox_1_state.get(key_a, True) else 'CHECKBOX_DEHLT'
-            oA1 = ar.operator("light_editor.toggle_kind", text="", icon=iA1, depress=group_checkbox_1_state.get(key_a, True))
-            oA1.group_key = key_a
-            oA2 = ar.operator("light_editor.toggle_group_exclusive", text="",
-                              icon=('RADIOBUT_ON' if group_checkbox_2_state.get(key_a, False) else 'RADIOBUT_OFF'),
-                              depress=group_checkbox_2_state.get(key_a, False))
-            oA2.group_key = key_a
-            select_icon = 'RESTRICT_SELECT_ON' if is_group_selected(key_a, lights) else 'RESTRICT_SELECT_OFF'
-            op_select = ar.operator("le.select_group", text="", icon=select_icon)
-            op_select.group_key = key_a
-            oA3 = ar.operator("light_editor.toggle_group", text="",
-                              emboss=True,
-                              icon=('DOWNARROW_HLT' if not group_collapse_dict.get(key_a, False) else 'RIGHTARROW'))
-            oA3.group_key = key_a
-            ar.label(text="All Lights (Alphabetical)", icon='LIGHT_DATA')
-            if not group_collapse_dict.get(key_a, False):
+            checked = group_checkbox_1_state.get(key_a, True)
+            isolated = group_checkbox_2_state.get(key_a, False)
+            collapsed = group_collapse_dict.get(key_a, False)
+            draw_group_header(ar, key_a, "All Lights (Alphabetical)", 'LIGHT_DATA',
+                              "light_editor.toggle_kind", checked, "light_editor.toggle_group_exclusive", isolated,
+                              is_group_selected(key_a, lights), collapsed)
+            if not collapsed:
                 lb6 = ab.box()
-                for o in sorted(lights, key=lambda x: x.name.lower()):
-                    draw_main_row(lb6, o)
-                    if o.light_expanded and not o.data.use_nodes:
-                        eb6 = lb6.box()
-                        draw_extra_params(self, eb6, o, o.data)
+                draw_light_rows(self, lb6, lights, selected_names)
             eb7 = layout.box()
             er7 = eb7.row(align=True)
             key_e = "all_emissives_alpha"
-            iem = 'CHECKBOX_HLT' if group_mat_checkbox_state.get(key_e, True) else 'CHECKBOX_DEHLT'
-            oE1 = er7.operator("light_editor.toggle_group_emissive_all_off", text="", icon=iem, depress=group_mat_checkbox_state.get(key_e, True))
-            oE1.group_key = key_e
-            oE2 = er7.operator("light_editor.isolate_group_emissive", text="",
-                               icon=('RADIOBUT_ON' if group_checkbox_2_state.get(key_e, False) else 'RADIOBUT_OFF'))
-            oE2.group_key = key_e
-            select_icon = 'RESTRICT_SELECT_ON' if is_group_selected(key_e, [o for o, _, _ in filtered_emissive_pairs]) else 'RESTRICT_SELECT_OFF'
-            op_select = er7.operator("le.select_group", text="", icon=select_icon)
-            op_select.group_key = key_e
-            oE3 = er7.operator("light_editor.toggle_group", text="",
-                               emboss=True,
-                               icon=('DOWNARROW_HLT' if not group_collapse_dict.get(key_e, False) else 'RIGHTARROW'))
-            oE3.group_key = key_e
-            er7.label(text="All Emissive Materials (Alphabetical)", icon='SHADING_RENDERED')
-            if not group_collapse_dict.get(key_e, False):
+            checked = group_mat_checkbox_state.get(key_e, True)
+            isolated = group_checkbox_2_state.get(key_e, False)
+            collapsed = group_collapse_dict.get(key_e, False)
+            draw_group_header(er7, key_e, "All Emissive Materials (Alphabetical)", 'SHADING_RENDERED',
+                              "light_editor.toggle_group_emissive_all_off", checked, "light_editor.isolate_group_emissive", isolated,
+                              is_group_selected(key_e, [o for o, _, _ in filtered_emissive_pairs]), collapsed)
+            if not collapsed:
                 cb7 = eb7.box()
-                grouped_emissives = group_emissive_by_material(filtered_emissive_pairs)
+                grouped_emissives = grouped_all
                 if not grouped_emissives:
                     cb7.label(text="No emissive materials match filter", icon='INFO')
-                for obj, mat, nodes in sorted(grouped_emissives, key=lambda x: f"{x[0].name}_{x[1].name}".lower()):
-                    draw_emissive_row(cb7, obj, mat, nodes)
+                for obj, mat, nodes in grouped_emissives:
+                    draw_emissive_row(cb7, obj, mat, nodes, selected_names)
             if scene.world:
                 draw_environment_single_row(layout.box(), context, filter_str)
-        elif scene.filter_light_types == 'KIND':
+        elif filter_type == 'KIND':
             kinds = ['AREA', 'POINT', 'SPOT', 'SUN', 'EMISSIVE']
+            # Bucket lights by type in one sweep; buckets keep the sorted order
+            lights_by_kind = defaultdict(list)
+            for o in lights:
+                lights_by_kind[_light_kind(o)].append(o)
             for kind in kinds:
                 if kind == 'EMISSIVE':
                     key_k = f"kind_{kind}"
+                    checked = group_mat_checkbox_state.get(key_k, True)
+                    isolated = group_checkbox_2_state.get(key_k, False)
                     collapsed = group_collapse_dict.get(key_k, False)
-                    emissives = [(o, m, n) for o, m, n in filtered_emissive_pairs]
+                    emissives = filtered_emissive_pairs
                     if emissives:
                         eb = layout.box()
                         er = eb.row(align=True)
-                        i_e = 'CHECKBOX_HLT' if group_mat_checkbox_state.get(key_k, True) else 'CHECKBOX_DEHLT'
-                        o_e1 = er.operator("light_editor.toggle_group_emissive_all_off", text="", icon=i_e, depress=group_mat_checkbox_state.get(key_k, True))
-                        o_e1.group_key = key_k
-                        o_e2 = er.operator("light_editor.isolate_group_emissive", text="",
-                                           icon=('RADIOBUT_ON' if group_checkbox_2_state.get(key_k, False) else 'RADIOBUT_OFF'))
-                        o_e2.group_key = key_k
-                        select_icon = 'RESTRICT_SELECT_ON' if is_group_selected(key_k, [o for o, _, _ in emissives]) else 'RESTRICT_SELECT_OFF'
-                        op_select = er.operator("le.select_group", text="", icon=select_icon)
-                        op_select.group_key = key_k
-                        o_e3 = er.operator("light_editor.toggle_group", text="",
-                                           emboss=True,
-                                           icon=('DOWNARROW_HLT' if not collapsed else 'RIGHTARROW'))
-                        o_e3.group_key = key_k
-                        er.label(text="Emissive Materials", icon='SHADING_RENDERED')
+                        draw_group_header(er, key_k, "Emissive Materials", 'SHADING_RENDERED',
+                                          "light_editor.toggle_group_emissive_all_off", checked, "light_editor.isolate_group_emissive", isolated,
+                                          is_group_selected(key_k, [o for o, _, _ in emissives]), collapsed)
                         if not collapsed:
                             cb = eb.box()
-                            grouped_emissives = group_emissive_by_material(emissives)
+                            grouped_emissives = grouped_all
                             if not grouped_emissives:
                                 cb.label(text="No emissive materials match filter", icon='INFO')
-                            for obj, mat, nodes in sorted(grouped_emissives, key=lambda x: f"{x[0].name}_{x[1].name}".lower()):
-                                draw_emissive_row(cb, obj, mat, nodes)
+                            for obj, mat, nodes in grouped_emissives:
+                                draw_emissive_row(cb, obj, mat, nodes, selected_names)
                 else:
-                    lights_in = [o for o in lights if o.data.type == kind]
+                    lights_in = lights_by_kind.get(kind)
                     if lights_in:
                         key_k = f"kind_{kind}"
+                        checked = group_checkbox_1_state.get(key_k, True)
+                        isolated = group_checkbox_2_state.get(key_k, False)
                         collapsed = group_collapse_dict.get(key_k, False)
                         kb = layout.box()
                         kr = kb.row(align=True)
-                        i_k = 'CHECKBOX_HLT' if group_checkbox_1_state.get(key_k, True) else 'CHECKBOX_DEHLT'
-                        o_k1 = kr.operator("light_editor.toggle_kind", text="", icon=i_k, depress=group_checkbox_1_state.get(key_k, True))
-                        o_k1.group_key = key_k
-                        o_k2 = kr.operator("light_editor.toggle_group_exclusive", text="",
-                                           icon=('RADIOBUT_ON' if group_checkbox_2_state.get(key_k, False) else 'RADIOBUT_OFF'),
-                                           depress=group_checkbox_2_state.get(key_k, False))
-                        o_k2.group_key = key_k
-                        select_icon = 'RESTRICT_SELECT_ON' if is_group_selected(key_k, lights_in) else 'RESTRICT_SELECT_OFF'
-                        op_select = kr.operator("le.select_group", text="", icon=select_icon)
-                        op_select.group_key = key_k
-                        o_k3 = kr.operator("light_editor.toggle_group", text="",
-                                           emboss=True,
-                                           icon=('DOWNARROW_HLT' if not collapsed else 'RIGHTARROW'))
-                        o_k3.group_key = key_k
-                        kr.label(text=f"{kind.title()} Lights", icon='LIGHT_{}'.format(kind))
+                        draw_group_header(kr, key_k, f"{kind.title()} Lights", 'LIGHT_{}'.format(kind),
+                                          "light_editor.toggle_kind", checked, "light_editor.toggle_group_exclusive", isolated,
+                                          is_group_selected(key_k, lights_in), collapsed)
                         if not collapsed:
                             lb = kb.box()
-                            for o in sorted(lights_in, key=lambda x: x.name.lower()):
-                                draw_main_row(lb, o)
-                                if o.light_expanded and not o.data.use_nodes:
-                                    eb = lb.box()
-                                    draw_extra_params(self, eb, o, o.data)
-        elif scene.filter_light_types == 'COLLECTION':
+                            draw_light_rows(self, lb, lights_in, selected_names)
+        elif filter_type == 'COLLECTION':
             all_colls = []
             try:
-                gather_layer_collections(context.view_layer.layer_collection, all_colls)
+                gather_layer_collections(view_layer.layer_collection, all_colls)
             except Exception:
                 all_colls = []
+            # Objects nest in several collections; read each one's material slots once
+            is_member = {}
+
+            def is_group_member(o):
+                member = is_member.get(o)
+                if member is None:
+                    member = is_member[o] = o.type == 'LIGHT' or any(
+                        ms.material in emissive_mats for ms in o.material_slots)
+                return member
+
             relevant = [lc for lc in all_colls if lc.collection.name != "Scene Collection" and
-                        any(o.type == 'LIGHT' or any(m in [mat for _, mat, _ in emissive_pairs] for m in o.material_slots) for o in lc.collection.all_objects)]
+                        any(is_group_member(o) for o in lc.collection.all_objects)]
             no_lights = [o for o in lights if len(o.users_collection) == 1 and o.users_collection[0].name == "Scene Collection"]
-            no_emissives = [o for o, _, _ in filtered_emissive_pairs if len(o.users_collection) == 1 and o.users_collection[0].name == "Scene Collection"]
+            no_emissives = [row for row in grouped_all if len(row[0].users_collection) == 1 and row[0].users_collection[0].name == "Scene Collection"]
+            # Reverse index: collection -> group objects / grouped emissive rows, built in one sweep
+            coll_to_objs = defaultdict(list)
+            for o in view_layer.objects:
+                if is_group_member(o):
+                    for c in o.users_collection:
+                        coll_to_objs[c].append(o)
+            coll_to_emissives = defaultdict(list)
+            for row in grouped_all:
+                for c in row[0].users_collection:
+                    coll_to_emissives[c].append(row)
             if not relevant and not no_lights and not no_emissives:
                 box = layout.box()
                 box.label(text="No Collections or Unassigned Lights/Emissives Found", icon='INFO')
@@ -2206,194 +2420,123 @@ class LIGHT_PT_editor(bpy.types.Panel):
                 for lc in relevant:
                     coll = lc.collection
                     group_key = f"coll_{coll.name}"
+                    isolated = group_checkbox_2_state.get(group_key, False)
                     collapsed = group_collapse_dict.get(group_key, False)
-                    group_objects = [o for o in context.view_layer.objects if
-                                    (o.type == 'LIGHT' or any(m in [mat for _, mat, _ in emissive_pairs] for m in o.material_slots)) and
-                                    any(c == coll for c in o.users_collection)]
+                    group_objects = coll_to_objs.get(coll, [])
                     header_box = layout.box()
                     hr = header_box.row(align=True)
                     icon_chk = 'CHECKBOX_HLT' if not lc.exclude else 'CHECKBOX_DEHLT'
                     op_inc = hr.operator("light_editor.toggle_collection", text="", icon=icon_chk, depress=not lc.exclude)
                     op_inc.group_key = group_key
-                    op_iso = hr.operator("light_editor.toggle_group_exclusive", text="",
-                                         icon=('RADIOBUT_ON' if group_checkbox_2_state.get(group_key, False) else 'RADIOBUT_OFF'),
-                                         depress=group_checkbox_2_state.get(group_key, False))
-                    op_iso.group_key = group_key
-                    select_icon = 'RESTRICT_SELECT_ON' if is_group_selected(group_key, group_objects) else 'RESTRICT_SELECT_OFF'
-                    op_select = hr.operator("le.select_group", text="", icon=select_icon)
-                    op_select.group_key = group_key
-                    op_tri = hr.operator("light_editor.toggle_group", text="",
-                                         emboss=True,
-                                         icon=('DOWNARROW_HLT' if not collapsed else 'RIGHTARROW'))
-                    op_tri.group_key = group_key
-                    hr.label(text=coll.name, icon='OUTLINER_COLLECTION')
+                    draw_group_header(hr, group_key, coll.name, 'OUTLINER_COLLECTION',
+                                      None, False, "light_editor.toggle_group_exclusive", isolated,
+                                      is_group_selected(group_key, group_objects), collapsed)
                     if not collapsed:
                         lights_in_collection = [o for o in coll.all_objects if o.type == 'LIGHT']
-                        lights_in = [o for o in lights_in_collection if (not filter_str or re.search(filter_str, o.name, re.I))]
+                        lights_in = [o for o in lights_in_collection if (match is None or match(o.name))]
                         if lights_in:
                             lb = header_box.box()
-                            for o in sorted(lights_in, key=lambda x: x.name.lower()):
-                                draw_main_row(lb, o)
-                                if o.light_expanded and not o.data.use_nodes:
-                                    eb = lb.box()
-                                    draw_extra_params(self, eb, o, o.data)
-                        emissives_in_collection = [(o, m, n) for o, m, n in filtered_emissive_pairs if any(c == coll for c in o.users_collection)]
+                            draw_light_rows(self, lb, sorted(lights_in, key=lambda x: x.name.casefold()), selected_names)
+                        emissives_in_collection = coll_to_emissives.get(coll, [])
                         if emissives_in_collection:
                             cb = header_box.box()
-                            grouped_emissives = group_emissive_by_material(emissives_in_collection)
-                            for obj, mat, nodes in sorted(grouped_emissives, key=lambda x: f"{x[0].name}_{x[1].name}".lower()):
-                                draw_emissive_row(cb, obj, mat, nodes)
+                            grouped_emissives = emissives_in_collection
+                            for obj, mat, nodes in grouped_emissives:
+                                draw_emissive_row(cb, obj, mat, nodes, selected_names)
                 if no_lights or no_emissives:
                     key_nc = "coll_No Collection"
+                    isolated = group_checkbox_2_state.get(key_nc, False)
                     collapsed_nc = group_collapse_dict.get(key_nc, False)
-                    group_objects = no_lights + no_emissives
+                    group_objects = no_lights + [o for o, _, _ in no_emissives]
                     nb = layout.box()
                     nr = nb.row(align=True)
                     col_disabled = nr.column(align=True)
                     col_disabled.enabled = False
                     op1 = col_disabled.operator("light_editor.toggle_collection", text="", icon='CHECKBOX_HLT', depress=True)
                     op1.group_key = key_nc
-                    op2 = nr.operator("light_editor.toggle_group_exclusive", text="",
-                                      icon=('RADIOBUT_ON' if group_checkbox_2_state.get(key_nc, False) else 'RADIOBUT_OFF'),
-                                      depress=group_checkbox_2_state.get(key_nc, False))
-                    op2.group_key = key_nc
-                    select_icon = 'RESTRICT_SELECT_ON' if is_group_selected(key_nc, group_objects) else 'RESTRICT_SELECT_OFF'
-                    op_select = nr.operator("le.select_group", text="", icon=select_icon)
-                    op_select.group_key = key_nc
-                    op3 = nr.operator("light_editor.toggle_group", text="",
-                                      emboss=True,
-                                      icon=('DOWNARROW_HLT' if not collapsed_nc else 'RIGHTARROW'))
-                    op3.group_key = key_nc
-                    nr.label(text="Not In Any Collections", icon='OUTLINER_COLLECTION')
+                    draw_group_header(nr, key_nc, "Not In Any Collections", 'OUTLINER_COLLECTION',
+                                      None, False, "light_editor.toggle_group_exclusive", isolated,
+                                      is_group_selected(key_nc, group_objects), collapsed_nc)
                     if not collapsed_nc:
                         lb2 = nb.box()
-                        for o in sorted(no_lights, key=lambda x: x.name.lower()):
-                            draw_main_row(lb2, o)
-                            if o.light_expanded and not o.data.use_nodes:
-                                eb2 = lb2.box()
-                                draw_extra_params(self, eb2, o, o.data)
+                        draw_light_rows(self, lb2, no_lights, selected_names)
                         if no_emissives:
                             cb2 = lb2.box()
-                            grouped_emissives = group_emissive_by_material(no_emissives)
-                            for obj, mat, nodes in sorted(grouped_emissives, key=lambda x: f"{x[0].name}_{x[1].name}".lower()):
-                                draw_emissive_row(cb2, obj, mat, nodes)
-        elif scene.filter_light_types == 'SELECTED':
+                            grouped_emissives = no_emissives
+                            for obj, mat, nodes in grouped_emissives:
+                                draw_emissive_row(cb2, obj, mat, nodes, selected_names)
+        elif filter_type == 'SELECTED':
+            # Split lights and emissives by selection in one pass each
+            selected_lights, not_selected_lights = [], []
+            for o in lights:
+                (selected_lights if o.name in selected_names else not_selected_lights).append(o)
+            selected_emissives, not_selected_emissives = [], []
+            for row in grouped_all:
+                (selected_emissives if row[0].name in selected_names else not_selected_emissives).append(row)
             # Selected Lights
-            selected_lights = [o for o in lights if o.select_get()]
             if selected_lights:
                 key_sl = "selected_lights"
+                checked = group_checkbox_1_state.get(key_sl, True)
+                isolated = group_checkbox_2_state.get(key_sl, False)
                 collapsed_sl = group_collapse_dict.get(key_sl, False)
                 sb = layout.box()
                 sr = sb.row(align=True)
-                i_sl = 'CHECKBOX_HLT' if group_checkbox_1_state.get(key_sl, True) else 'CHECKBOX_DEHLT'
-                op_sl1 = sr.operator("light_editor.toggle_kind", text="", icon=i_sl, depress=group_checkbox_1_state.get(key_sl, True))
-                op_sl1.group_key = key_sl
-                op_sl2 = sr.operator("light_editor.toggle_group_exclusive", text="",
-                                     icon=('RADIOBUT_ON' if group_checkbox_2_state.get(key_sl, False) else 'RADIOBUT_OFF'),
-                                     depress=group_checkbox_2_state.get(key_sl, False))
-                op_sl2.group_key = key_sl
-                select_icon = 'RESTRICT_SELECT_ON' if is_group_selected(key_sl, selected_lights) else 'RESTRICT_SELECT_OFF'
-                op_select = sr.operator("le.select_group", text="", icon=select_icon)
-                op_select.group_key = key_sl
-                op_sl3 = sr.operator("light_editor.toggle_group", text="",
-                                     emboss=True,
-                                     icon=('DOWNARROW_HLT' if not collapsed_sl else 'RIGHTARROW'))
-                op_sl3.group_key = key_sl
-                sr.label(text="Selected Lights", icon='LIGHT_DATA')
+                draw_group_header(sr, key_sl, "Selected Lights", 'LIGHT_DATA',
+                                  "light_editor.toggle_kind", checked, "light_editor.toggle_group_exclusive", isolated,
+                                  is_group_selected(key_sl, selected_lights), collapsed_sl)
                 if not collapsed_sl:
                     sb = sb.box()
-                    for o in sorted(selected_lights, key=lambda x: x.name.lower()):
-                        draw_main_row(sb, o)
-                        if o.light_expanded and not o.data.use_nodes:
-                            eb = sb.box()
-                            draw_extra_params(self, eb, o, o.data)
+                    draw_light_rows(self, sb, selected_lights, selected_names)
             # Selected Emissive Meshes
-            selected_emissives = [(o, m, n) for o, m, n in filtered_emissive_pairs if o.select_get()]
             if selected_emissives:
                 key_se = "selected_emissives"
+                checked = group_mat_checkbox_state.get(key_se, True)
+                isolated = group_checkbox_2_state.get(key_se, False)
                 collapsed_se = group_collapse_dict.get(key_se, False)
                 se_box = layout.box()
                 se_row = se_box.row(align=True)
-                i_se = 'CHECKBOX_HLT' if group_mat_checkbox_state.get(key_se, True) else 'CHECKBOX_DEHLT'
-                op_se1 = se_row.operator("light_editor.toggle_group_emissive_all_off", text="", icon=i_se, depress=group_mat_checkbox_state.get(key_se, True))
-                op_se1.group_key = key_se
-                op_se2 = se_row.operator("light_editor.isolate_group_emissive", text="",
-                                         icon=('RADIOBUT_ON' if group_checkbox_2_state.get(key_se, False) else 'RADIOBUT_OFF'),
-                                         depress=group_checkbox_2_state.get(key_se, False))
-                op_se2.group_key = key_se
-                select_icon = 'RESTRICT_SELECT_ON' if is_group_selected(key_se, [o for o, _, _ in selected_emissives]) else 'RESTRICT_SELECT_OFF'
-                op_select = se_row.operator("le.select_group", text="", icon=select_icon)
-                op_select.group_key = key_se
-                op_se3 = se_row.operator("light_editor.toggle_group", text="",
-                                         emboss=True,
-                                         icon=('DOWNARROW_HLT' if not collapsed_se else 'RIGHTARROW'))
-                op_se3.group_key = key_se
-                se_row.label(text="Selected Emissive Meshes", icon='SHADING_RENDERED')
+                draw_group_header(se_row, key_se, "Selected Emissive Meshes", 'SHADING_RENDERED',
+                                  "light_editor.toggle_group_emissive_all_off", checked, "light_editor.isolate_group_emissive", isolated,
+                                  is_group_selected(key_se, [o for o, _, _ in selected_emissives]), collapsed_se)
                 if not collapsed_se:
                     se_cb = se_box.box()
-                    grouped_emissives = group_emissive_by_material(selected_emissives)
+                    grouped_emissives = selected_emissives
                     if not grouped_emissives:
                         se_cb.label(text="No selected emissive materials match filter", icon='INFO')
-                    for obj, mat, nodes in sorted(grouped_emissives, key=lambda x: f"{x[0].name}_{x[1].name}".lower()):
-                        draw_emissive_row(se_cb, obj, mat, nodes)
+                    for obj, mat, nodes in grouped_emissives:
+                        draw_emissive_row(se_cb, obj, mat, nodes, selected_names)
             # Not Selected Lights
-            not_selected_lights = [o for o in lights if not o.select_get()]
             if not_selected_lights:
                 key_nsl = "not_selected_lights"
+                checked = group_checkbox_1_state.get(key_nsl, True)
+                isolated = group_checkbox_2_state.get(key_nsl, False)
                 collapsed_nsl = group_collapse_dict.get(key_nsl, False)
                 nsl_box = layout.box()
                 nsl_row = nsl_box.row(align=True)
-                i_nsl = 'CHECKBOX_HLT' if group_checkbox_1_state.get(key_nsl, True) else 'CHECKBOX_DEHLT'
-                op_nsl1 = nsl_row.operator("light_editor.toggle_kind", text="", icon=i_nsl, depress=group_checkbox_1_state.get(key_nsl, True))
-                op_nsl1.group_key = key_nsl
-                op_nsl2 = nsl_row.operator("light_editor.toggle_group_exclusive", text="",
-                                           icon=('RADIOBUT_ON' if group_checkbox_2_state.get(key_nsl, False) else 'RADIOBUT_OFF'),
-                                           depress=group_checkbox_2_state.get(key_nsl, False))
-                op_nsl2.group_key = key_nsl
-                select_icon = 'RESTRICT_SELECT_ON' if is_group_selected(key_nsl, not_selected_lights) else 'RESTRICT_SELECT_OFF'
-                op_select = nsl_row.operator("le.select_group", text="", icon=select_icon)
-                op_select.group_key = key_nsl
-                op_nsl3 = nsl_row.operator("light_editor.toggle_group", text="",
-                                           emboss=True,
-                                           icon=('DOWNARROW_HLT' if not collapsed_nsl else 'RIGHTARROW'))
-                op_nsl3.group_key = key_nsl
-                nsl_row.label(text="Not Selected Lights", icon='LIGHT_DATA')
+                draw_group_header(nsl_row, key_nsl, "Not Selected Lights", 'LIGHT_DATA',
+                                  "light_editor.toggle_kind", checked, "light_editor.toggle_group_exclusive", isolated,
+                                  is_group_selected(key_nsl, not_selected_lights), collapsed_nsl)
                 if not collapsed_nsl:
                     nslb = nsl_box.box()
-                    for o in sorted(not_selected_lights, key=lambda x: x.name.lower()):
-                        draw_main_row(nslb, o)
-                        if o.light_expanded and not o.data.use_nodes:
-                            eb = nslb.box()
-                            draw_extra_params(self, eb, o, o.data)
+                    draw_light_rows(self, nslb, not_selected_lights, selected_names)
             # Not Selected Emissive Meshes
-            not_selected_emissives = [(o, m, n) for o, m, n in filtered_emissive_pairs if not o.select_get()]
             if not_selected_emissives:
                 key_nse = "not_selected_emissives"
+                checked = group_mat_checkbox_state.get(key_nse, True)
+                isolated = group_checkbox_2_state.get(key_nse, False)
                 collapsed_nse = group_collapse_dict.get(key_nse, False)
                 nse_box = layout.box()
                 nse_row = nse_box.row(align=True)
-                i_nse = 'CHECKBOX_HLT' if group_mat_checkbox_state.get(key_nse, True) else 'CHECKBOX_DEHLT'
-                op_nse1 = nse_row.operator("light_editor.toggle_group_emissive_all_off", text="", icon=i_nse, depress=group_mat_checkbox_state.get(key_nse, True))
-                op_nse1.group_key = key_nse
-                op_nse2 = nse_row.operator("light_editor.isolate_group_emissive", text="",
-                                           icon=('RADIOBUT_ON' if group_checkbox_2_state.get(key_nse, False) else 'RADIOBUT_OFF'),
-                                           depress=group_checkbox_2_state.get(key_nse, False))
-                op_nse2.group_key = key_nse
-                select_icon = 'RESTRICT_SELECT_ON' if is_group_selected(key_nse, [o for o, _, _ in not_selected_emissives]) else 'RESTRICT_SELECT_OFF'
-                op_select = nse_row.operator("le.select_group", text="", icon=select_icon)
-                op_select.group_key = key_nse
-                op_nse3 = nse_row.operator("light_editor.toggle_group", text="",
-                                           emboss=True,
-                                           icon=('DOWNARROW_HLT' if not collapsed_nse else 'RIGHTARROW'))
-                op_nse3.group_key = key_nse
-                nse_row.label(text="Not Selected Emissive Meshes", icon='SHADING_RENDERED')
+                draw_group_header(nse_row, key_nse, "Not Selected Emissive Meshes", 'SHADING_RENDERED',
+                                  "light_editor.toggle_group_emissive_all_off", checked, "light_editor.isolate_group_emissive", isolated,
+                                  is_group_selected(key_nse, [o for o, _, _ in not_selected_emissives]), collapsed_nse)
                 if not collapsed_nse:
                     nse_cb = nse_box.box()
-                    grouped_emissives = group_emissive_by_material(not_selected_emissives)
+                    grouped_emissives = not_selected_emissives
                     if not grouped_emissives:
                         nse_cb.label(text="No not selected emissive materials match filter", icon='INFO')
-                    for obj, mat, nodes in sorted(grouped_emissives, key=lambda x: f"{x[0].name}_{x[1].name}".lower()):
-                        draw_emissive_row(nse_cb, obj, mat, nodes)
+                    for obj, mat, nodes in grouped_emissives:
+                        draw_emissive_row(nse_cb, obj, mat, nodes, selected_names)
             # Environment
             if scene.world:
                 draw_environment_single_row(layout.box(), context, filter_str)
@@ -2403,11 +2546,6 @@ env_isolated_ui_state = False
 
 def draw_environment_single_row(box, context, filter_str=""):
     scene = context.scene
-    world = scene.world
-    nt = world.node_tree if world and world.use_nodes else None
-    output_node = next((n for n in nt.nodes if n.type == 'OUTPUT_WORLD'), None) if nt else None
-    surf_input = output_node.inputs.get("Surface") if output_node else None
-    vol_input = output_node.inputs.get("Volume") if output_node else None
     is_on = environment_checkbox_state.get('environment', True)
     icon = 'CHECKBOX_HLT' if is_on else 'CHECKBOX_DEHLT'
 
@@ -2432,93 +2570,171 @@ def draw_environment_single_row(box, context, filter_str=""):
                         icon='RIGHTARROW' if collapsed else 'DOWNARROW_HLT').group_key = group_key
     header_row.label(text="Environment", icon='WORLD')
 
-    # Content (Surface/Volume)
+    # Content (Surface/Volume); the world output is only looked up when expanded
     if not collapsed:
+        world = scene.world
+        nt = world.node_tree if world and world.use_nodes else None
+        output_node = get_node_of_type(nt, 'OUTPUT_WORLD') if nt else None
         content_box = box.box()
         if show_surface:
+            surf_input = output_node.inputs.get("Surface") if output_node else None
+            surf_linked = bool(surf_input and surf_input.is_linked)
             row = content_box.row(align=True)
             row.operator("le.toggle_env_socket",
-                         text="", icon='OUTLINER_OB_LIGHT' if surf_input and surf_input.is_linked else 'LIGHT_DATA',
-                         depress=surf_input and surf_input.is_linked).socket_name = "Surface"
-            op = row.operator("le.isolate_environment", text="", icon='RADIOBUT_ON' if isolate_env_surface_state else 'RADIOBUT_OFF')
+                         text="", icon='OUTLINER_OB_LIGHT' if surf_linked else 'LIGHT_DATA',
+                         depress=surf_linked).socket_name = "Surface"
+            op = row.operator("le.isolate_environment", text="", icon='RADIOBUT_ON' if _env_isolate_flags["SURFACE"] else 'RADIOBUT_OFF')
             op.mode = "SURFACE"
             row.prop(scene, "env_surface_label", text="")
         if show_volume:
+            vol_input = output_node.inputs.get("Volume") if output_node else None
+            vol_linked = bool(vol_input and vol_input.is_linked)
             row = content_box.row(align=True)
             row.operator("le.toggle_env_socket",
-                         text="", icon='OUTLINER_OB_LIGHT' if vol_input and vol_input.is_linked else 'LIGHT_DATA',
-                         depress=vol_input and vol_input.is_linked).socket_name = "Volume"
-            op = row.operator("le.isolate_environment", text="", icon='RADIOBUT_ON' if isolate_env_volume_state else 'RADIOBUT_OFF')
+                         text="", icon='OUTLINER_OB_LIGHT' if vol_linked else 'LIGHT_DATA',
+                         depress=vol_linked).socket_name = "Volume"
+            op = row.operator("le.isolate_environment", text="", icon='RADIOBUT_ON' if _env_isolate_flags["VOLUME"] else 'RADIOBUT_OFF')
             op.mode = "VOLUME"
             row.prop(scene, "env_volume_label", text="")
 
 @persistent
-def LE_update_light_enabled_on_visibility_change(scene):
+def LE_update_light_enabled_on_visibility_change(scene, depsgraph=None):
     """Update light_enabled property when hide_viewport or hide_render changes."""
-    try:
-        context = bpy.context
-        for obj in context.scene.objects:
-            if obj.type == 'LIGHT' and obj.name in context.view_layer.objects:
-                # Consider the light disabled if either viewport or render is hidden
-                new_enabled = not (obj.hide_viewport or obj.hide_render)
-                if obj.light_enabled != new_enabled:
-                    obj.light_enabled = new_enabled
-                    # Redraw relevant UI areas
-                    for area in context.screen.areas:
-                        if area.type in {'VIEW_3D', 'PROPERTIES', 'NODE_EDITOR'}:
-                            area.tag_redraw()
-    except Exception as e:
-        pass
-        
-@persistent
-def LE_clear_emission_links(dummy):
-    """Clear stale _emission_links data on scene load."""
-    for mat in bpy.data.materials:
-        if "_emission_links" in mat:
-            del mat["_emission_links"]
+    # Visibility flags live on objects; other updates cannot change them
+    if depsgraph is not None and not depsgraph.id_type_updated('OBJECT'):
+        return
+    context = bpy.context
+    # No view layer while a file is loading
+    view_layer = getattr(context, "view_layer", None)
+    if view_layer is None:
+        return
+    needs_redraw = False
+    for obj in get_view_layer_lights(view_layer):
+        try:
+            # Consider the light disabled if either viewport or render is hidden
+            new_enabled = not (obj.hide_viewport or obj.hide_render)
+            if obj.light_enabled != new_enabled:
+                obj.light_enabled = new_enabled
+                needs_redraw = True
+        except ReferenceError:
+            # Cached light was freed before the cache was invalidated
+            continue
+    # Redraw relevant UI areas once, however many lights flipped
+    if needs_redraw and context.screen is not None:
+        _tag_redraw(context)
+
+# Owner of the use_nodes message bus subscriptions
+_msgbus_owner = object()
+
+def _on_use_nodes_change():
+    """Redraw the Light Editor areas when use_nodes is toggled."""
+    context = bpy.context
+    if context.screen is not None:
+        # The toggle came from this window's UI; only its areas show it
+        _tag_redraw(context)
+        return
+    wm = context.window_manager
+    if wm is None:
+        return
+    for window in wm.windows:
+        screen = window.screen
+        if screen is None:
+            continue
+        for area in screen.areas:
+            if area.type in _REDRAW_AREA_TYPES:
+                area.tag_redraw()
+
+def subscribe_use_nodes():
+    """Subscribe to use_nodes changes on materials, lights and worlds."""
+    bpy.msgbus.clear_by_owner(_msgbus_owner)
+    for rna_type in (bpy.types.Material, bpy.types.Light, bpy.types.World):
+        bpy.msgbus.subscribe_rna(
+            key=(rna_type, "use_nodes"),
+            owner=_msgbus_owner,
+            args=(),
+            notify=_on_use_nodes_change,
+        )
+
+
+def reset_group_state():
+    """Forget toggle and isolate state keyed by names from the previous file."""
+    for state in (group_checkbox_1_state, group_checkbox_2_state, group_mat_checkbox_state,
+                  group_lights_original_state, other_groups_original_state,
+                  _light_isolate_state_backup, emissive_isolate_icon_state, _emissive_link_backup):
+        state.clear()
+    for key in _env_isolate_flags:
+        _env_isolate_flags[key] = False
+    for key in _env_link_backup:
+        _env_link_backup[key] = None
+    environment_checkbox_state['environment'] = True
+    _unified_isolate_manager.reset()
+    _unified_on_off_manager.reset()
+
 @persistent
-def LE_force_redraw_on_use_nodes_change(scene):
-    """Force redraw when use_nodes changes."""
-    try:
-        wm = bpy.context.window_manager
-        for window in wm.windows:
-            for area in window.screen.areas:
-                if area.type in {'VIEW_3D', 'PROPERTIES', 'NODE_EDITOR'}:
-                    area.tag_redraw()
-    except Exception:
-        pass  # Silently ignore any errors
+def LE_clear_handler(dummy):
+    """Clear caches and sync light_enabled with visibility on file load."""
+    _node_of_type_names.clear()
+    _view_layer_lights.clear()
+    # Pointer-keyed entries may be reused by the newly loaded datablocks
+    invalidate_emissive_cache()
+    reset_group_state()
+    # Loading a file drops message bus subscriptions
+    subscribe_use_nodes()
+    for obj in get_view_layer_lights(bpy.context.view_layer):
+        obj.light_enabled = not (obj.hide_viewport or obj.hide_render)
+
+# Datablock types whose changes can alter which objects are emissive; collection
+# links and view-layer excludes change which meshes the view layer contains
+_EMISSIVE_ID_TYPES = ('MATERIAL', 'NODETREE', 'MESH', 'COLLECTION', 'SCENE')
+
+def _emissive_update(depsgraph):
+    """Whether a depsgraph update can change which objects are emissive."""
+    if any(depsgraph.id_type_updated(t) for t in _EMISSIVE_ID_TYPES):
+        return True
+    if not depsgraph.id_type_updated('OBJECT'):
+        return False
+    # Object-linked material slots tag geometry/shading; moves and selection only tag transforms
+    return any(
+        isinstance(update.id, bpy.types.Object) and (update.is_updated_geometry or update.is_updated_shading)
+        for update in depsgraph.updates
+    )
 
+def invalidate_emissive_cache():
+    """Drop cached emissive object and material lookups."""
+    emissive_material_cache.clear()
+    _material_emissive_nodes.clear()
+    _emit_sockets_cache.clear()
+    _tree_emissive_nodes.clear()
+    _filtered_emissive[:] = (None, None, None)
+    _grouped_emissive[:] = (None, None)
+    _emissive_mat_set[:] = (None, frozenset())
 
 @persistent
-def LE_check_lights_enabled(dummy):
-    """Ensure light_enabled property matches visibility state."""
-    for obj in bpy.data.objects:
-        if obj.type == 'LIGHT':
-            if (obj.hide_viewport and obj.hide_render):
-                if obj.name in bpy.context.view_layer.objects:
-                    bpy.context.view_layer.objects[obj.name].light_enabled = False
-            else:
-                if obj.name in bpy.context.view_layer.objects:
-                    bpy.context.view_layer.objects[obj.name].light_enabled = True
+def LE_clear_emissive_cache(scene, depsgraph=None):
+    """Clear the emissive material cache when materials or objects change."""
+    if depsgraph is None or _emissive_update(depsgraph):
+        invalidate_emissive_cache()
+    if depsgraph is None or depsgraph.id_type_updated('LIGHT') or depsgraph.id_type_updated('OBJECT'):
+        _light_kind_cache.clear()
+        _lights_by_kind[:] = (None, {})
+    if (depsgraph is None or depsgraph.id_type_updated('OBJECT')
+            or depsgraph.id_type_updated('COLLECTION') or depsgraph.id_type_updated('SCENE')):
+        _view_layer_lights.clear()
 
 @persistent
-def LE_clear_handler(dummy):
-    """Clear light states on file load."""
-    context = bpy.context
-    for obj in bpy.data.objects:
-        if obj.type == 'LIGHT':
-            if not (obj.hide_viewport or obj.hide_render):
-                if obj.name in context.view_layer.objects:
-                    context.view_layer.objects[obj.name].light_enabled = True
-            else:
-                if obj.name in context.view_layer.objects:
-                    context.view_layer.objects[obj.name].light_enabled = False
+def LE_undo_handler(scene, *args):
+    """Drop pointer-keyed caches; undo and redo reallocate changed datablocks."""
+    invalidate_emissive_cache()
+    _node_of_type_names.clear()
+    _light_kind_cache.clear()
+    _view_layer_lights.clear()
+    _lights_by_kind[:] = (None, {})
 
 @persistent
-def LE_clear_emissive_cache(dummy):
-    """Clear the emissive material cache."""
-    global emissive_material_cache
-    emissive_material_cache.clear()
+def LE_depsgraph_update(scene, depsgraph=None):
+    """Run the Light Editor's depsgraph_update_post work from a single handler."""
+    LE_clear_emissive_cache(scene, depsgraph)
+    LE_update_light_enabled_on_visibility_change(scene, depsgraph)
 
 classes = (
     LIGHT_OT_ToggleGroup,
@@ -2539,14 +2755,27 @@ classes = (
     LE_OT_toggle_env_socket,
 )
 
+register_classes = bpy.utils.register_classes_factory(classes)[0]
+
+@persistent
+def set_initial_render_layer(dummy):
+    """Point the render layer selector at the active view layer."""
+    if hasattr(bpy.types.Scene, 'light_editor_selected_render_layer'):
+        try:
+            current_vl_name = bpy.context.view_layer.name
+            if bpy.context.scene.view_layers.get(current_vl_name):
+                bpy.context.scene.light_editor_selected_render_layer = current_vl_name
+        except:
+            pass
+
 def register():
     """Register all classes and properties."""
     # Register handlers
-    bpy.app.handlers.depsgraph_update_post.append(LE_force_redraw_on_use_nodes_change)
+    bpy.app.handlers.depsgraph_update_post.append(LE_depsgraph_update)
+    subscribe_use_nodes()
     bpy.app.handlers.load_post.append(LE_clear_handler)
-    bpy.app.handlers.load_post.append(LE_check_lights_enabled)
-    bpy.app.handlers.depsgraph_update_post.append(LE_clear_emissive_cache)
-    bpy.app.handlers.depsgraph_update_post.append(LE_update_light_enabled_on_visibility_change)
+    bpy.app.handlers.undo_post.append(LE_undo_handler)
+    bpy.app.handlers.redo_post.append(LE_undo_handler)
 
     # Register the new render layer property
     bpy.types.Scene.light_editor_selected_render_layer = bpy.props.EnumProperty(
@@ -2556,15 +2785,6 @@ def register():
         update=update_render_layer,
     )
     # Set initial render layer
-    def set_initial_render_layer(dummy):
-        if hasattr(bpy.types.Scene, 'light_editor_selected_render_layer'):
-            try:
-                current_vl_name = bpy.context.view_layer.name
-                if bpy.context.scene.view_layers.get(current_vl_name):
-                    bpy.context.scene.light_editor_selected_render_layer = current_vl_name
-            except:
-                pass
-
     bpy.app.handlers.load_post.append(set_initial_render_layer)
     try:
         set_initial_render_layer(None)
@@ -2577,8 +2797,7 @@ def register():
     bpy.types.Scene.current_active_light = bpy.props.PointerProperty(type=bpy.types.Object)
     bpy.types.Scene.current_exclusive_group = bpy.props.StringProperty()
     
-    for cls in classes:
-        bpy.utils.register_class(cls)
+    register_classes()
 
     bpy.types.Scene.light_editor_filter = StringProperty(
         name="Filter",
@@ -2588,12 +2807,14 @@ def register():
     bpy.types.Scene.collapse_all_emissives = BoolProperty(
         name="Collapse All Emissive Materials",
         default=False,
-        description="Collapse the 'All Emissive Materials (Alphabetical)' section"
+        description="Collapse the 'All Emissive Materials (Alphabetical)' section",
+        options=set(),  # UI state; not animatable
     )
     bpy.types.Scene.collapse_all_emissives_alpha = BoolProperty(
         name="Collapse All Emissive Materials Alphabetical",
         default=False,
-        description="Collapse the 'All Emissive Materials (Alphabetical)' section in the 'All' view"
+        description="Collapse the 'All Emissive Materials (Alphabetical)' section in the 'All' view",
+        options=set(),
     )
     bpy.types.Scene.light_editor_kind_alpha = BoolProperty(
         name="By Kind",
@@ -2633,76 +2854,63 @@ def register():
     )
     bpy.types.Object.light_expanded = BoolProperty(
         name="Expanded",
-        default=False
+        default=False,
+        options=set(),
     )
 
+# Properties added to Blender types in register()
+_REGISTERED_PROPS = (
+    (bpy.types.Scene, (
+        "light_editor_selected_render_layer",
+        "env_surface_label",
+        "env_volume_label",
+        "current_active_light",
+        "current_exclusive_group",
+        "light_editor_filter",
+        "light_editor_kind_alpha",
+        "light_editor_group_by_collection",
+        "filter_light_types",
+        "collapse_all_emissives",
+        "collapse_all_emissives_alpha",
+    )),
+    (bpy.types.Light, (
+        "soft_falloff",
+        "max_bounce",
+        "multiple_instance",
+        "shadow_caustic",
+        "spread",
+    )),
+    (bpy.types.Object, (
+        "light_enabled",
+        "light_turn_off_others",
+        "light_expanded",
+    )),
+)
+
 def unregister():
     """Unregister all classes and properties."""
     # Remove handlers
-    if LE_update_light_enabled_on_visibility_change in bpy.app.handlers.depsgraph_update_post:
-        bpy.app.handlers.depsgraph_update_post.remove(LE_update_light_enabled_on_visibility_change)
-    if LE_force_redraw_on_use_nodes_change in bpy.app.handlers.depsgraph_update_post:
-        bpy.app.handlers.depsgraph_update_post.remove(LE_force_redraw_on_use_nodes_change)
+    if LE_depsgraph_update in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(LE_depsgraph_update)
+    bpy.msgbus.clear_by_owner(_msgbus_owner)
     if LE_clear_handler in bpy.app.handlers.load_post:
         bpy.app.handlers.load_post.remove(LE_clear_handler)
-    if LE_check_lights_enabled in bpy.app.handlers.load_post:
-        bpy.app.handlers.load_post.remove(LE_check_lights_enabled)
-    if LE_clear_emissive_cache in bpy.app.handlers.depsgraph_update_post:
-        bpy.app.handlers.depsgraph_update_post.remove(LE_clear_emissive_cache)
+    if LE_undo_handler in bpy.app.handlers.undo_post:
+        bpy.app.handlers.undo_post.remove(LE_undo_handler)
+    if LE_undo_handler in bpy.app.handlers.redo_post:
+        bpy.app.handlers.redo_post.remove(LE_undo_handler)
     
     # Remove set_initial_render_layer handler
-    def set_initial_render_layer(dummy):
-        if hasattr(bpy.types.Scene, 'light_editor_selected_render_layer'):
-            try:
-                current_vl_name = bpy.context.view_layer.name
-                if bpy.context.scene.view_layers.get(current_vl_name):
-                    bpy.context.scene.light_editor_selected_render_layer = current_vl_name
-            except:
-                pass
     if set_initial_render_layer in bpy.app.handlers.load_post:
         bpy.app.handlers.load_post.remove(set_initial_render_layer)
 
     # Unregister properties
-    if hasattr(bpy.types.Scene, 'light_editor_selected_render_layer'):
-        del bpy.types.Scene.light_editor_selected_render_layer
-    if hasattr(bpy.types.Scene, 'env_surface_label'):
-        del bpy.types.Scene.env_surface_label
-    if hasattr(bpy.types.Scene, 'env_volume_label'):
-        del bpy.types.Scene.env_volume_label
-    if hasattr(bpy.types.Scene, 'current_active_light'):
-        del bpy.types.Scene.current_active_light
-    if hasattr(bpy.types.Scene, 'current_exclusive_group'):
-        del bpy.types.Scene.current_exclusive_group
-    if hasattr(bpy.types.Scene, 'light_editor_filter'):
-        del bpy.types.Scene.light_editor_filter
-    if hasattr(bpy.types.Scene, 'light_editor_kind_alpha'):
-        del bpy.types.Scene.light_editor_kind_alpha
-    if hasattr(bpy.types.Scene, 'light_editor_group_by_collection'):
-        del bpy.types.Scene.light_editor_group_by_collection
-    if hasattr(bpy.types.Scene, 'filter_light_types'):
-        del bpy.types.Scene.filter_light_types
-    if hasattr(bpy.types.Scene, 'collapse_all_emissives'):
-        del bpy.types.Scene.collapse_all_emissives
-    if hasattr(bpy.types.Scene, 'collapse_all_emissives_alpha'):
-        del bpy.types.Scene.collapse_all_emissives_alpha
-    if hasattr(bpy.types.Light, 'soft_falloff'):
-        del bpy.types.Light.soft_falloff
-    if hasattr(bpy.types.Light, 'max_bounce'):
-        del bpy.types.Light.max_bounce
-    if hasattr(bpy.types.Light, 'multiple_instance'):
-        del bpy.types.Light.multiple_instance
-    if hasattr(bpy.types.Light, 'shadow_caustic'):
-        del bpy.types.Light.shadow_caustic
-    if hasattr(bpy.types.Light, 'spread'):
-        del bpy.types.Light.spread
-    if hasattr(bpy.types.Object, 'light_enabled'):
-        del bpy.types.Object.light_enabled
-    if hasattr(bpy.types.Object, 'light_turn_off_others'):
-        del bpy.types.Object.light_turn_off_others
-    if hasattr(bpy.types.Object, 'light_expanded'):
-        del bpy.types.Object.light_expanded
-
-    # Unregister classes
+    for bl_type, names in _REGISTERED_PROPS:
+        for name in names:
+            if hasattr(bl_type, name):
+                delattr(bl_type, name)
+
+    # Unregister classes; skip any that failed to register or were already removed
     for cls in reversed(classes):
         if hasattr(bpy.types, cls.__name__):
             bpy.utils.unregister_class(cls)
@@ -15,13 +15,28 @@ bl_info = {
 import bpy
 from bpy.types import Operator, Panel
 from bpy.props import StringProperty
+from bpy.app.handlers import persistent
 
 # -------------------------------------------------------------------------
 # Scene-scoped state
 # -------------------------------------------------------------------------
-# Dictionaries for collapse and exclusivity (persist across redraws)
-bpy.types.Scene.group_collapse_dict = {}
-bpy.types.Scene.group_exclusive_dict = {}
+# Collapse and exclusivity flags per scene name (persist across redraws)
+_group_collapse = {}
+_group_exclusive = {}
+
+def _scene_state(store, scene):
+    """Return the group_key -> bool dict for this scene in the given store."""
+    return store.setdefault(scene.name, {})
+
+@persistent
+def _clear_group_state(dummy):
+    """Forget flags from the previous file; its scene names may repeat in the new one."""
+    _group_collapse.clear()
+    _group_exclusive.clear()
+
+# Lightgroup support depends only on the Blender build, so probe RNA once
+_HAS_LIGHTGROUPS = 'lightgroups' in bpy.types.ViewLayer.bl_rna.properties
+_WORLD_HAS_LIGHTGROUP = 'lightgroup' in bpy.types.World.bl_rna.properties
 
 # -------------------------------------------------------------------------
 # Helpers
@@ -29,7 +44,7 @@ bpy.types.Scene.group_exclusive_dict = {}
 def _get_world_if_lightgroup_capable(context):
     """Return the scene World if it supports 'lightgroup' (Cycles), else None."""
     world = context.scene.world
-    return world if (world and hasattr(world, "lightgroup")) else None
+    return world if (world and _WORLD_HAS_LIGHTGROUP) else None
 
 def _display_name(obj):
     """Nice label used in lists/filters."""
@@ -37,15 +52,34 @@ def _display_name(obj):
         return f"{obj.name} (Environment)"
     return obj.name
 
+def _reset_light_selection(context):
+    """Deselect all objects and clear the light/Environment checkboxes."""
+    for obj in context.selected_objects:
+        obj.select_set(False)
+    for obj in context.scene.objects:
+        # Only write flags that are set, so the update callback doesn't fire per light
+        if obj.type == 'LIGHT' and obj.is_selected:
+            obj.is_selected = False
+
+    world = _get_world_if_lightgroup_capable(context)
+    if world and getattr(world, "le_is_selected", False):
+        world.le_is_selected = False
+
 # -------------------------------------------------------------------------
 # Render Layer Functions
 # -------------------------------------------------------------------------
+# Enum item strings must stay referenced from Python; rebuild only when view layers change
+_render_layer_items_cache = []
+_render_layer_items_sig = ()
+
 def get_render_layer_items(self, context):
     """Return a list of render layer items for the EnumProperty."""
-    items = []
-    for view_layer in context.scene.view_layers:
-        items.append((view_layer.name, view_layer.name, ""))
-    return items
+    global _render_layer_items_cache, _render_layer_items_sig
+    sig = tuple(vl.name for vl in context.scene.view_layers)
+    if sig != _render_layer_items_sig:
+        _render_layer_items_cache = [(name, name, "") for name in sig]
+        _render_layer_items_sig = sig
+    return _render_layer_items_cache
 
 def update_render_layer(self, context):
     selected = self.selected_render_layer
@@ -80,7 +114,7 @@ class LG_AssignLightGroup(Operator):
 
     def execute(self, context):
         view_layer = context.view_layer
-        if (hasattr(view_layer, "lightgroups")
+        if (_HAS_LIGHTGROUPS
                 and view_layer.active_lightgroup_index >= 0
                 and view_layer.active_lightgroup_index < len(view_layer.lightgroups)):
             active_group = view_layer.lightgroups[view_layer.active_lightgroup_index]
@@ -92,10 +126,13 @@ class LG_AssignLightGroup(Operator):
 
             # Environment (World) if user checked its checkbox
             world = _get_world_if_lightgroup_capable(context)
-            if world and getattr(world, "le_is_selected", False):
+            world_selected = bool(world and getattr(world, "le_is_selected", False))
+            if world_selected:
                 world.lightgroup = active_group.name
 
-            bpy.ops.lg_editor.reset_light_selection()
+            # Nothing was assigned, so there is no selection to clear
+            if selected_lights or world_selected:
+                _reset_light_selection(context)
         else:
             self.report({'WARNING'}, "No light group selected or available.")
         return {'FINISHED'}
@@ -116,7 +153,7 @@ class LG_UnassignLightGroup(Operator):
         if world and getattr(world, "le_is_selected", False):
             world.lightgroup = ""
 
-        bpy.ops.lg_editor.reset_light_selection()
+        _reset_light_selection(context)
         return {'FINISHED'}
 
 class LG_ResetLightSelection(Operator):
@@ -125,15 +162,7 @@ class LG_ResetLightSelection(Operator):
     bl_label = "Reset Light Selection"
 
     def execute(self, context):
-        bpy.ops.object.select_all(action='DESELECT')
-        for obj in context.scene.objects:
-            if obj.type == 'LIGHT':
-                obj.is_selected = False
-
-        world = _get_world_if_lightgroup_capable(context)
-        if world and hasattr(world, "le_is_selected"):
-            world.le_is_selected = False
-
+        _reset_light_selection(context)
         self.report({'INFO'}, "Deselected all lights and Environment checkbox")
         return {'FINISHED'}
 
@@ -141,6 +170,7 @@ class LG_ToggleLightSelection(Operator):
     """Toggle selection for an individual light object."""
     bl_idname = "lg_editor.toggle_light_selection"
     bl_label = "Toggle Light Selection"
+    bl_options = {'INTERNAL'}
 
     light_name: bpy.props.StringProperty()
 
@@ -160,19 +190,18 @@ class LG_ToggleGroupExclusive(Operator):
     group_key: bpy.props.StringProperty()
 
     def execute(self, context):
-        is_exclusive = not context.scene.group_exclusive_dict.get(self.group_key, False)
-        context.scene.group_exclusive_dict[self.group_key] = is_exclusive
-
-        if is_exclusive:
-            exclusive_group_name = self.group_key.replace("group_", "")
-            for obj in context.scene.objects:
-                if obj.type == 'LIGHT':
-                    obj.hide_viewport = getattr(obj, "lightgroup", "") != exclusive_group_name
-            # World has no viewport toggle; leave it untouched.
-        else:
-            for obj in context.scene.objects:
-                if obj.type == 'LIGHT':
-                    obj.hide_viewport = False
+        exclusive = _scene_state(_group_exclusive, context.scene)
+        is_exclusive = not exclusive.get(self.group_key, False)
+        exclusive[self.group_key] = is_exclusive
+
+        # One pass for both directions; World has no viewport toggle, so it is left untouched.
+        exclusive_group_name = self.group_key[len("group_"):]
+        for obj in context.scene.objects:
+            if obj.type != 'LIGHT':
+                continue
+            hide = is_exclusive and getattr(obj, "lightgroup", "") != exclusive_group_name
+            if obj.hide_viewport != hide:
+                obj.hide_viewport = hide
         return {'FINISHED'}
 
 class LG_ToggleGroup(Operator):
@@ -182,7 +211,8 @@ class LG_ToggleGroup(Operator):
     group_key: bpy.props.StringProperty()
 
     def execute(self, context):
-        context.scene.group_collapse_dict[self.group_key] = not context.scene.group_collapse_dict.get(self.group_key, False)
+        collapse = _scene_state(_group_collapse, context.scene)
+        collapse[self.group_key] = not collapse.get(self.group_key, False)
         return {'FINISHED'}
 
 class LG_AddLightGroup(Operator):
@@ -192,7 +222,7 @@ class LG_AddLightGroup(Operator):
 
     def execute(self, context):
         view_layer = context.view_layer
-        if not hasattr(view_layer, "lightgroups"):
+        if not _HAS_LIGHTGROUPS:
             self.report({'WARNING'}, "This Blender version doesn't support per-view-layer lightgroups.")
             return {'CANCELLED'}
 
@@ -208,7 +238,7 @@ class LG_RemoveLightGroup(Operator):
 
     def execute(self, context):
         view_layer = context.view_layer
-        if hasattr(view_layer, "lightgroups"):
+        if _HAS_LIGHTGROUPS:
             if view_layer.active_lightgroup_index >= 0 and view_layer.active_lightgroup_index < len(view_layer.lightgroups):
                 active_group_name = view_layer.lightgroups[view_layer.active_lightgroup_index].name
 
@@ -224,12 +254,12 @@ class LG_RemoveLightGroup(Operator):
                     view_layer.active_lightgroup_index = max(0, len(view_layer.lightgroups) - 1)
 
                 group_key = f"group_{active_group_name}"
-                context.scene.group_collapse_dict.pop(group_key, None)
-                context.scene.group_exclusive_dict.pop(group_key, None)
+                _scene_state(_group_collapse, context.scene).pop(group_key, None)
+                _scene_state(_group_exclusive, context.scene).pop(group_key, None)
 
-                for area in context.screen.areas:
-                    if area.type == 'VIEW_3D':
-                        area.tag_redraw()
+                # The operator runs from the panel, so only its own area is stale
+                if context.area:
+                    context.area.tag_redraw()
             else:
                 self.report({'WARNING'}, "No active light group to remove.")
         else:
@@ -278,7 +308,7 @@ class LG_PT_LightGroupPanel(Panel):
         # Lightgroup list / add / remove
         row = layout.row(align=True)
         col = row.column()
-        if hasattr(view_layer, "lightgroups"):
+        if _HAS_LIGHTGROUPS:
             col.template_list("UI_UL_list", "lightgroups", view_layer, "lightgroups",
                               view_layer, "active_lightgroup_index", rows=3)
             col = row.column(align=True)
@@ -307,48 +337,44 @@ class LG_PT_LightGroupPanel(Panel):
         # -----------------------------------------------------------------
         groups = {}
         capable_world = _get_world_if_lightgroup_capable(context)
-
-        if hasattr(view_layer, "lightgroups"):
+        filter_pattern = scene.light_group_filter.strip().lower()
+        if capable_world and filter_pattern and filter_pattern not in _display_name(capable_world).lower():
+            capable_world = None
+        world_group = (getattr(capable_world, "lightgroup", "") or "") if capable_world else None
+
+        # One pass over the scene: renderable, filter-matching lights keyed by lightgroup ("" = none)
+        lights_by_group = {}
+        for obj in scene.objects:
+            if obj.type != 'LIGHT' or obj.hide_render:
+                continue
+            if filter_pattern and filter_pattern not in obj.name.lower():
+                continue
+            lights_by_group.setdefault(getattr(obj, "lightgroup", "") or "", []).append(obj)
+
+        if _HAS_LIGHTGROUPS:
             for lg in view_layer.lightgroups:
-                lights_in_group = [
-                    obj for obj in scene.objects
-                    if obj.type == 'LIGHT'
-                    and not obj.hide_render
-                    and getattr(obj, "lightgroup", "") == lg.name
-                ]
+                lights_in_group = list(lights_by_group.get(lg.name, ()))
                 # Include the World if it's assigned to this group
-                if capable_world and getattr(capable_world, "lightgroup", "") == lg.name:
+                if world_group == lg.name:
                     lights_in_group.append(capable_world)
-                groups[lg.name] = lights_in_group
+                # While filtering, hide groups with no matches
+                if lights_in_group or not filter_pattern:
+                    groups[lg.name] = lights_in_group
 
         # Not Assigned
-        not_assigned = [
-            obj for obj in scene.objects
-            if obj.type == 'LIGHT'
-            and not obj.hide_render
-            and not getattr(obj, "lightgroup", "")
-        ]
-        if capable_world and not getattr(capable_world, "lightgroup", ""):
+        not_assigned = lights_by_group.get("", [])
+        if world_group == "":
             not_assigned.append(capable_world)
         if not_assigned:
             groups["Not Assigned"] = not_assigned
 
-        # Filter groups
-        filter_pattern = scene.light_group_filter.strip().lower()
-        filtered_groups = {}
-        for grp_name, group_objs in groups.items():
-            if filter_pattern:
-                filtered_objs = [obj for obj in group_objs if filter_pattern in _display_name(obj).lower()]
-                if filtered_objs:
-                    filtered_groups[grp_name] = filtered_objs
-            else:
-                filtered_groups[grp_name] = group_objs
-
         # Draw
-        for grp_name, group_objs in filtered_groups.items():
+        collapse = _group_collapse.get(scene.name, {})
+        exclusive = _group_exclusive.get(scene.name, {})
+        for grp_name, group_objs in groups.items():
             group_key = f"group_{grp_name}"
-            collapsed = scene.group_collapse_dict.get(group_key, False)
-            is_exclusive = scene.group_exclusive_dict.get(group_key, False)
+            collapsed = collapse.get(group_key, False)
+            is_exclusive = exclusive.get(group_key, False)
 
             header_box = layout.box()
             header_row = header_box.row(align=True)
@@ -383,6 +409,8 @@ classes = (
     LG_ClearFilter,
 )
 
+register_classes, unregister_classes = bpy.utils.register_classes_factory(classes + (LG_PT_LightGroupPanel,))
+
 def register():
     # Scene properties
     bpy.types.Scene.selected_render_layer = bpy.props.EnumProperty(
@@ -413,10 +441,8 @@ def register():
         default=False
     )
 
-    for cls in classes:
-        bpy.utils.register_class(cls)
-
-    bpy.utils.register_class(LG_PT_LightGroupPanel)
+    register_classes()
+    bpy.app.handlers.load_post.append(_clear_group_state)
 
 
 def unregister():
@@ -426,13 +452,10 @@ def unregister():
     del bpy.types.Object.is_selected
     if hasattr(bpy.types.World, "le_is_selected"):
         del bpy.types.World.le_is_selected
-    del bpy.types.Scene.group_collapse_dict
-    del bpy.types.Scene.group_exclusive_dict
-
-    for cls in reversed(classes):
-        bpy.utils.unregister_class(cls)
 
-    bpy.utils.unregister_class(LG_PT_LightGroupPanel)
+    if _clear_group_state in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(_clear_group_state)
+    unregister_classes()
 
 
 if __name__ == "__main__":
@@ -20,6 +20,19 @@ def get_selected_collections(context):
                         selected.append(id_item)
     return selected
 
+# -------------------------------------------------------------------
+#   Helper: Make a Single Object Selected and Active
+# -------------------------------------------------------------------
+def select_only(context, obj):
+    """
+    Deselects the current selection directly instead of running the
+    select_all operator, then selects obj and makes it active.
+    """
+    for o in context.selected_objects:
+        o.select_set(False)
+    obj.select_set(True)
+    context.view_layer.objects.active = obj
+
 # -------------------------------------------------------------------
 #   Helper Functions: Ensure BB_ Collections
 # -------------------------------------------------------------------
@@ -38,9 +51,7 @@ def ensure_bb_collection(light):
 
     # Use the operator to create the light linking collection
     try:
-        bpy.ops.object.select_all(action='DESELECT')
-        light.select_set(True)
-        bpy.context.view_layer.objects.active = light
+        select_only(bpy.context, light)
         bpy.ops.object.light_linking_receiver_collection_new()
         
         if hasattr(light, "light_linking") and hasattr(light.light_linking, "receiver_collection"):
@@ -265,9 +276,7 @@ class LL_OT_RefreshSelectedCollections(bpy.types.Operator):
             item.selected = True
 
         scene.ll_collection_index = 0 if scene.ll_collection_items else -1
-        for area in context.screen.areas:
-            if area.type == 'VIEW_3D':
-                area.tag_redraw()
+        force_redraw(context)
 
         self.report({'INFO'}, f"Filtered collections to {len(selected_collections)} item(s)")
         return {'FINISHED'}
@@ -397,9 +406,7 @@ class LL_OT_Link(bpy.types.Operator):
                 self.report({'ERROR'}, f"Light must be visible for linking: {light.name}")
                 continue
 
-            bpy.ops.object.select_all(action='DESELECT')
-            light.select_set(True)
-            context.view_layer.objects.active = light
+            select_only(context, light)
 
             new_group = ensure_bb_collection(light)
             # Here is where we can show "Please create a light group first" if we fail:
@@ -500,9 +507,7 @@ class LL_OT_ShadowLink(bpy.types.Operator):
                 self.report({'ERROR'}, f"Light must be visible for linking: {light.name}")
                 continue
 
-            bpy.ops.object.select_all(action='DESELECT')
-            light.select_set(True)
-            context.view_layer.objects.active = light
+            select_only(context, light)
 
             new_group = ensure_shadow_collection(light)
             if not new_group:
@@ -689,12 +694,12 @@ classes = [
     LL_UL_CollectionList_UI,
 ]
 
+# The panel registers after the list classes it draws
+register_classes, unregister_classes = bpy.utils.register_classes_factory(classes + [LL_PT_Panel])
 
-def register():
-    for cls in classes:
-        bpy.utils.register_class(cls)
 
-    bpy.utils.register_class(LL_PT_Panel)
+def register():
+    register_classes()
 
     bpy.types.Scene.ll_light_items = bpy.props.CollectionProperty(type=LL_LightItem)
     bpy.types.Scene.ll_mesh_items = bpy.props.CollectionProperty(type=LL_MeshItem)
@@ -723,10 +728,7 @@ def unregister():
     del bpy.types.Scene.ll_collection_index
     del bpy.types.Scene.ll_list_rows
 
-    bpy.utils.unregister_class(LL_PT_Panel)
-
-    for cls in reversed(classes):
-        bpy.utils.unregister_class(cls)
+    unregister_classes()
 
     bpy.app.handlers.load_post.remove(LL_clear_handler)
 